@@ -1,45 +1,59 @@
 import os
 import json
 import random
-import requests
 import re
 import time
-from datetime import datetime
-from apify_client import ApifyClient
-import tweepy
+import heapq
+from datetime import datetime, timezone
+import reply_queue
+import outbox
+import x_client
+import tweet_text
+import metrics
+import profiling
+import deadline
 
 # ---------------- Config ----------------
 APIFY_TOKEN = os.getenv("APIFY_API_TOKEN")
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API")          # Perplexity secret
-TWITTER_API_KEY = os.getenv("API_KEY")                    # Twitter API key
-TWITTER_API_SECRET = os.getenv("API_SECRET")              # Twitter API secret
-TWITTER_ACCESS_TOKEN = os.getenv("ACCESS_TOKEN")          # Twitter access token
-TWITTER_ACCESS_SECRET = os.getenv("ACCESS_SECRET")        # Twitter access secret
-TWITTER_BEARER_TOKEN = os.getenv("BEARER_TOKEN")          # Fixed: Use dedicated bearer token env var (set it separately if needed)
+# Twitter credentials (API_KEY, API_SECRET, ACCESS_TOKEN, ACCESS_SECRET) are read by x_client
 
 MODE = os.environ.get("MODE", "fetch")  # Default to fetch if not set
 
 # ---------------- Files ----------------
 PROFILES_FILE = "profiles.txt"
-REPLY_QUEUE_FILE = "reply_queue.json"
-RECENT_PROFILES_FILE = "recent_profiles.json"
+REPLY_QUEUE_DB = reply_queue.REPLY_QUEUE_DB
+PROFILE_ROTATION_FILE = "profile_rotation.json"  # profile -> last fetched / empty cooldown
+WATERMARKS_FILE = "apify_watermarks.json"        # profile -> last postId already processed
+DATASET_CACHE_FILE = "apify_dataset_cache.json"  # in-flight selection + actor run, reused by a retry
+APIFY_TIMINGS_FILE = "apify_timings.json"
 
 # ---------------- Settings ----------------
 ACTOR_ID = "Fo9GoU5wC270BgcBr"
 TWEETS_PER_PROFILE = 1
 PROFILES_PER_RUN = 3
-RECENT_MEMORY = 10
+EMPTY_COOLDOWN_HOURS = 12  # skip profiles that returned nothing for this long
+DRAFT_WORKERS = 3          # concurrent Perplexity calls when drafting queued replies
+DRAFT_AHEAD = int(os.getenv("DRAFT_AHEAD", "2"))  # draft only the next N items reply runs will claim
+DATASET_CACHE_TTL_MINUTES = 30
+APIFY_ASYNC = os.environ.get("APIFY_ASYNC", "0") == "1"  # start actor + poll instead of blocking .call()
+POLL_INITIAL_SECONDS = 2
+POLL_MAX_SECONDS = 30
+TERMINAL_RUN_STATUSES = {"SUCCEEDED", "FAILED", "TIMED-OUT", "ABORTED"}
 DRY_RUN = False
 
+_pending_watermarks = {}  # newest postId per profile seen this run, saved by save_watermarks()
+
 # ---------------- Clients ----------------
-apify_client = ApifyClient(APIFY_TOKEN)
-twitter_client = tweepy.Client(
-    bearer_token=TWITTER_BEARER_TOKEN,
-    consumer_key=TWITTER_API_KEY,
-    consumer_secret=TWITTER_API_SECRET,
-    access_token=TWITTER_ACCESS_TOKEN,
-    access_token_secret=TWITTER_ACCESS_SECRET
-)
+_apify_client = None
+
+def get_apify_client():
+    """ApifyClient built on first use, so reply/status runs and early exits never import it."""
+    global _apify_client
+    if _apify_client is None:
+        from apify_client import ApifyClient
+        _apify_client = ApifyClient(APIFY_TOKEN)
+    return _apify_client
 
 # ---------------- Utils ----------------
 def load_json(path):
@@ -60,70 +74,252 @@ def clean_text(text):
         return ""
     text = re.sub(r'\[\d+\](?:\[\d+\])*', '', text)
     text = re.sub(r'\s+', ' ', text).strip()
-    if len(text) > 273:
-        trimmed = text[:273]
-        last_stop = max(trimmed.rfind('।'), trimmed.rfind('.'), trimmed.rfind('!'), trimmed.rfind('?'))
-        if last_stop > 200:
-            text = trimmed[:last_stop+1]
-        else:
-            text = trimmed[:trimmed.rfind(' ')]
-        if text[-1] not in {'।', '.', '?', '!'}:
-            text += "..."
-    return text.strip()
+    # X weighted length, cut at a sentence end in the last ~30% if possible
+    return tweet_text.truncate(text, min_ratio=0.7)
 
 # ---------------- Profile Handling ----------------
 def get_profiles():
     with open(PROFILES_FILE, "r") as f:
         return [line.strip() for line in f if line.strip()]
 
+def load_rotation():
+    """Rotation state; profiles.txt is only re-read when its mtime changes."""
+    rotation = load_json(PROFILE_ROTATION_FILE)
+    mtime = os.path.getmtime(PROFILES_FILE)
+    if rotation.get("source_mtime") != mtime:
+        known = rotation.get("profiles", {})
+        rotation = {
+            "source_mtime": mtime,
+            "profiles": {p: known.get(p, {"last_fetched": 0, "empty_until": 0}) for p in get_profiles()},
+        }
+    return rotation
+
 def select_profiles():
-    all_profiles = get_profiles()
-    recent = load_json(RECENT_PROFILES_FILE).get("recent", [])
-    candidates = [p for p in all_profiles if p not in recent]
-    if len(candidates) < PROFILES_PER_RUN:
-        candidates = all_profiles
-    # Safety check to avoid random.sample error if fewer profiles than PROFILES_PER_RUN
-    num_to_select = min(PROFILES_PER_RUN, len(candidates))
-    selected = random.sample(candidates, num_to_select)
-    recent = selected + recent
-    recent = recent[:RECENT_MEMORY]
-    save_json(RECENT_PROFILES_FILE, {"recent": recent})
+    """Pick the PROFILES_PER_RUN profiles that have gone longest without a fetch.
+
+    A retry within DATASET_CACHE_TTL_MINUTES of a run whose fetch was never consumed gets
+    that run's selection back (and with it the actor dataset, if one was started).
+    """
+    inflight = load_inflight()
+    if inflight:
+        print(f"♻️ Retrying the unfinished selection from {(time.time() - inflight['created']) / 60:.0f} min ago.")
+        return inflight["profiles"]
+    rotation = load_rotation()
+    entries = rotation["profiles"]
+    now = time.time()
+    ready = [(v["last_fetched"], random.random(), p) for p, v in entries.items() if v.get("empty_until", 0) <= now]
+    if len(ready) < PROFILES_PER_RUN:
+        ready = [(v["last_fetched"], random.random(), p) for p, v in entries.items()]
+    selected = [p for _, _, p in heapq.nsmallest(PROFILES_PER_RUN, ready)]
+    save_json(DATASET_CACHE_FILE, {"profiles": selected, "created": now})
     return selected
 
+def mark_fetched(profiles):
+    """The selection's tweets are handled: rotate past these profiles and drop the in-flight record."""
+    rotation = load_rotation()
+    now = time.time()
+    for p in profiles:
+        if p in rotation["profiles"]:
+            rotation["profiles"][p]["last_fetched"] = now
+    save_json(PROFILE_ROTATION_FILE, rotation)
+    save_json(DATASET_CACHE_FILE, {})
+
+def mark_empty_profiles(profiles, tweets):
+    rotation = load_rotation()
+    until = time.time() + EMPTY_COOLDOWN_HOURS * 3600
+    empty = [p for p in profiles if not tweets.get(p) and p in rotation["profiles"]]
+    for p in empty:
+        rotation["profiles"][p]["empty_until"] = until
+    if empty:
+        print(f"💤 No new tweets from {len(empty)} profile(s), cooling down for {EMPTY_COOLDOWN_HOURS}h.")
+        save_json(PROFILE_ROTATION_FILE, rotation)
+
 # ---------------- Apify Fetch ----------------
-def fetch_tweets(profiles):
+def _post_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def load_inflight():
+    """The last run's selection (+ actor dataset) if it was never consumed and is within the TTL."""
+    inflight = load_json(DATASET_CACHE_FILE)
+    if inflight.get("profiles") and time.time() - inflight.get("created", 0) < DATASET_CACHE_TTL_MINUTES * 60:
+        return inflight
+    return None
+
+def get_cached_dataset(profiles, limit):
+    inflight = load_inflight()
+    if inflight and inflight["profiles"] == list(profiles) and inflight.get("limit") == limit:
+        return inflight.get("datasetId")
+    return None
+
+def remember_dataset(profiles, limit, dataset_id, run_id=None):
+    """Store the actor run next to the in-flight selection, so a retry reads it instead of re-running."""
+    inflight = load_inflight() or {"profiles": list(profiles), "created": time.time()}
+    inflight.update({"limit": limit, "datasetId": dataset_id, "runId": run_id})
+    save_json(DATASET_CACHE_FILE, inflight)
+
+def save_watermarks():
+    """Persist watermarks seen by fetch_tweets; call once the fetched tweets are handled."""
+    if not _pending_watermarks:
+        return
+    watermarks = load_json(WATERMARKS_FILE)
+    for profile, post_id in _pending_watermarks.items():
+        current = _post_id(watermarks.get(profile, {}).get("last_id"))
+        if current is None or post_id > current:
+            watermarks[profile] = {"last_id": str(post_id), "updated": datetime.utcnow().isoformat()}
+    save_json(WATERMARKS_FILE, watermarks)
+    _pending_watermarks.clear()
+
+def clear_state():
+    """Drop watermarks a failed earlier run left unsaved; the daemon calls this before each run."""
+    _pending_watermarks.clear()
+
+def stream_run_items(run, timings):
+    """Yield dataset items of a started actor run as they appear, polling with backoff."""
+    client = get_apify_client()
+    run_client = client.run(run["id"])
+    dataset = client.dataset(run["defaultDatasetId"])
+    offset, delay, status = 0, POLL_INITIAL_SECONDS, run.get("status")
+    try:
+        while True:
+            status = run_client.get()["status"]
+            page = dataset.list_items(offset=offset, limit=100)
+            if page.items and "first_item" not in timings:
+                timings["first_item"] = round(time.time() - timings["started_at"], 2)
+            for item in page.items:
+                yield item
+            offset += len(page.items)
+            if status in TERMINAL_RUN_STATUSES and not page.items:
+                break
+            if deadline.expired():
+                print("⏳ Run budget nearly used, stopping the scrape with what has arrived.")
+                break
+            if page.items:
+                delay = POLL_INITIAL_SECONDS
+            else:
+                time.sleep(delay)
+                delay = min(delay * 2, POLL_MAX_SECONDS)
+    finally:
+        timings["complete"] = round(time.time() - timings["started_at"], 2)
+        timings["status"] = status
+        if status not in TERMINAL_RUN_STATUSES:
+            # quota filled (or deadline hit) before the scrape finished; stop paying for the rest
+            print("🛑 Aborting actor run early.")
+            run_client.abort()
+
+def record_timings(timings):
+    print(f"⏱️ Apify run: started in {timings.get('start')}s, first item at {timings.get('first_item', '-')}s, "
+          f"done at {timings.get('complete')}s ({timings.get('status')})")
+    history = load_json(APIFY_TIMINGS_FILE).get("runs", [])
+    history.append({k: v for k, v in timings.items() if k != "started_at"})
+    save_json(APIFY_TIMINGS_FILE, {"runs": history[-50:]})
+
+@metrics.timed("apify")
+def fetch_tweets(profiles, while_running=None):
+    """Fetch tweets for profiles; in APIFY_ASYNC mode while_running() overlaps with the scrape."""
     total_limit = TWEETS_PER_PROFILE * len(profiles)  # Fixed: Global limit to cover all profiles
+    dataset_id = get_cached_dataset(profiles, total_limit)
+    if dataset_id:
+        print(f"♻️ Reusing actor dataset {dataset_id} from the last {DATASET_CACHE_TTL_MINUTES} min.")
+        return collect_tweets(get_apify_client().dataset(dataset_id).iterate_items(), profiles)
+
     run_input = {"profileUrls": profiles, "resultsLimit": total_limit}
     print(f"Fetching up to {total_limit} tweet(s) total from {len(profiles)} profiles ...")
-    run = apify_client.actor(ACTOR_ID).call(run_input=run_input)
+    if not APIFY_ASYNC:
+        client = get_apify_client()
+        run = client.actor(ACTOR_ID).call(run_input=run_input, wait_secs=deadline.wait_secs())
+        items = client.dataset(run["defaultDatasetId"]).iterate_items()
+        if run["status"] not in TERMINAL_RUN_STATUSES:
+            # wait budget ran out mid-scrape: stop paying for it as the async path does, and keep the
+            # partial read out of the dataset cache and the watermarks (queued ids are deduplicated)
+            print(f"🛑 Actor run still {run['status']} at the deadline, aborting it.")
+            client.run(run["id"]).abort()
+            tweets = collect_tweets(items, profiles)
+            _pending_watermarks.clear()
+            return tweets
+        remember_dataset(profiles, total_limit, run["defaultDatasetId"], run["id"])
+        return collect_tweets(items, profiles)
+
+    timings = {"started_at": time.time()}
+    run = get_apify_client().actor(ACTOR_ID).start(run_input=run_input)
+    timings["start"] = round(time.time() - timings["started_at"], 2)
+    remember_dataset(profiles, total_limit, run["defaultDatasetId"], run["id"])
+    print(f"🚀 Actor run {run['id']} started, doing other work meanwhile...")
+    if while_running:
+        while_running()
+    items = stream_run_items(run, timings)
+    tweets = collect_tweets(items, profiles)
+    items.close()
+    record_timings(timings)
+    return tweets
+
+def _tweet_time(item):
+    """Best-effort tweet timestamp from an actor item, as naive UTC ISO (None if unknown)."""
+    value = item.get("timestamp") or item.get("createdAt") or item.get("postedAt")
+    if not value:
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            ts = value / 1000 if value > 1e11 else value
+            return datetime.utcfromtimestamp(ts).isoformat()
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            parsed = datetime.strptime(str(value), "%a %b %d %H:%M:%S %z %Y")
+        if parsed.tzinfo:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed.isoformat()
+    except (ValueError, OverflowError, OSError):
+        return None
+
+def collect_tweets(items, profiles):
+    """Keep up to TWEETS_PER_PROFILE unseen tweets per profile, stopping once every quota is filled."""
+    watermarks = load_json(WATERMARKS_FILE)
     all_tweets = {}
+    skipped = 0
 
-    for item in apify_client.dataset(run["defaultDatasetId"]).iterate_items():
+    for item in items:
         print("🔍 Raw item:", json.dumps(item, indent=2, ensure_ascii=False))
 
         profile = item.get("profileUrl")
         text = item.get("postText") or item.get("text") or ""  # ✅ safe key usage
         if not text:
             continue
+        post_id = _post_id(item.get("postId"))
+        last_seen = _post_id(watermarks.get(profile, {}).get("last_id"))
+        if post_id is not None and last_seen is not None and post_id <= last_seen:
+            skipped += 1
+            continue
         if profile not in all_tweets:
             all_tweets[profile] = []
         if len(all_tweets[profile]) < TWEETS_PER_PROFILE:
             all_tweets[profile].append({
                 "id": item.get("postId"),
-                "text": text
+                "text": text,
+                "posted_at": _tweet_time(item)
             })
+            # only kept tweets move the watermark; ones over the quota stay unseen for the next fetch
+            if post_id is not None and post_id > _pending_watermarks.get(profile, 0):
+                _pending_watermarks[profile] = post_id
+        if len(all_tweets) >= len(profiles) and all(len(v) >= TWEETS_PER_PROFILE for v in all_tweets.values()):
+            break
+    if skipped:
+        print(f"⏭️ Skipped {skipped} already-processed tweet(s).")
     print(f"📊 Fetched tweets: {dict([(k, len(v)) for k, v in all_tweets.items()])}")  # Debug: Show what was fetched
     return all_tweets
 
 # ---------------- Perplexity ----------------
-def fetch_perplexity_analysis(tweet_text):
-    if not tweet_text:
+@metrics.timed("perplexity")
+def fetch_perplexity_analysis(text):
+    if not text:
         print("⚠️ No tweet text provided to Perplexity.")
         return ""
     if not PERPLEXITY_API_KEY:
         print("❌ Invalid or missing Perplexity key — check environment variable PERPLEXITY_API")
         return ""
-    trimmed_text = tweet_text[:500]
+    trimmed_text = text[:500]
     prompt = f"(YOU ARE A NO FILTER ANALYST SO NOW) \"give me only critical analysis of \\\"{trimmed_text}\\\" , in less than 260 characters in hinglish, don't start like this tweet is about etc., no headings, no character no. mention, sound like a human\""  
     url = "https://api.perplexity.ai/chat/completions"
     headers = {"Authorization": f"Bearer {PERPLEXITY_API_KEY}", "Content-Type": "application/json"}
@@ -135,8 +331,9 @@ def fetch_perplexity_analysis(tweet_text):
         ],
         "max_tokens": 180
     }
+    import requests
     try:
-        r = requests.post(url, headers=headers, json=data, timeout=20)
+        r = requests.post(url, headers=headers, json=data, timeout=deadline.clamp(20))
         if r.status_code != 200:
             print(f"❌ Perplexity API error {r.status_code}")
             return ""
@@ -145,6 +342,29 @@ def fetch_perplexity_analysis(tweet_text):
         print("❌ Perplexity fetch error:", e)
         return ""
 
+def draft_is_valid(draft):
+    return bool(draft) and clean_text(draft) == draft
+
+def prepare_drafts(queue):
+    """Generate Perplexity analyses for queued tweets so reply mode only has to post."""
+    if deadline.expired():
+        print("⏳ Run budget nearly used, leaving drafts for reply time.")
+        return 0
+    pending = reply_queue.items_needing_drafts(queue, DRAFT_AHEAD)
+    if not pending:
+        return 0
+    print(f"📝 Drafting replies for {len(pending)} queued tweet(s) ({DRAFT_WORKERS} workers)...")
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=DRAFT_WORKERS) as pool:
+        drafts = list(pool.map(lambda item: fetch_perplexity_analysis(item["text"]), pending))
+    drafted = 0
+    for item, draft in zip(pending, drafts):
+        if draft:
+            reply_queue.set_draft(queue, item["seq"], draft)
+            drafted += 1
+    print(f"📝 Stored {drafted}/{len(pending)} draft(s).")
+    return drafted
+
 # ---------------- Twitter ----------------
 def post_tweet(text, reply_to_id=None):
     if not text:
@@ -154,21 +374,28 @@ def post_tweet(text, reply_to_id=None):
         if DRY_RUN:
             print(f"💬 DRY RUN: {text}")
             return True
-        if reply_to_id:
-            resp = twitter_client.create_tweet(text=text, in_reply_to_tweet_id=reply_to_id)
-        else:
-            resp = twitter_client.create_tweet(text=text)
-        print(f"✅ Tweeted! ID: {resp.data['id']}")
+        tweet_id = outbox.send("apyfi1", text, x_client.create_tweet, reply_to=reply_to_id)
+        print(f"✅ Tweeted! ID: {tweet_id}")
         return True
     except Exception as e:
-        print(f"❌ Post error: {e}")
+        print(f"❌ Post error (kept in outbox for retry): {e}")
         return False
 
 # ---------------- Step 1: Fetch + Immediate Reply ----------------
 def fetch_and_reply():
+    if not outbox.preflight("apyfi1"):
+        return
     selected_profiles = select_profiles()
-    tweets = fetch_tweets(selected_profiles)
-    queue = load_json(REPLY_QUEUE_FILE)
+    queue = reply_queue.connect(REPLY_QUEUE_DB)
+
+    def while_scraping():
+        reply_queue.expire_stale(queue)
+        prepare_drafts(queue)  # drafts for already-queued items while the actor runs
+
+    profiling.snapshot("before parse")
+    tweets = fetch_tweets(selected_profiles, while_running=while_scraping)
+    profiling.snapshot("after parse")
+    mark_empty_profiles(selected_profiles, tweets)
 
     queued_count = 0
     for i, (profile, tweet_data_list) in enumerate(tweets.items()):
@@ -185,49 +412,63 @@ def fetch_and_reply():
                 time.sleep(delay)
                 if post_tweet(reply_text, reply_to_id=tid):
                     print(f"✅ Replied to first tweet {tid}")
-            else:
-                if profile not in queue:
-                    queue[profile] = []
-                queue[profile].append({
-                    "id": tid,
-                    "text": text,
-                    "added": datetime.utcnow().isoformat()
-                })
+            elif tid and reply_queue.enqueue(queue, profile, tid, text, posted_at=tweet_data.get("posted_at")):
                 queued_count += 1
 
-    save_json(REPLY_QUEUE_FILE, queue)
+    save_watermarks()
+    mark_fetched(selected_profiles)
+    reply_queue.expire_stale(queue)
+    prepare_drafts(queue)
     print(f"\n✅ Queue updated ({queued_count} added) and fetch step completed.")
 
 # ---------------- Step 2: Reply from Queue ----------------
 def queue_reply():
-    queue = load_json(REPLY_QUEUE_FILE)
-    if not queue:
+    if not outbox.preflight("apyfi1"):
+        return
+    queue = reply_queue.connect(REPLY_QUEUE_DB)
+    evicted = reply_queue.expire_stale(queue)
+    if evicted:
+        print(f"🧹 Evicted {evicted} queued tweet(s) older than {reply_queue.MAX_AGE_HOURS}h.")
+    tweet_data = reply_queue.claim_next(queue)
+    if not tweet_data:
         print("⚠️ Queue empty, nothing to reply.")
+        print(f"📊 Reply run: served 0, evicted {evicted}")
         return
 
-    for profile in list(queue.keys()):
-        if queue[profile]:
-            tweet_data = queue[profile].pop(0)
-            tid, text = tweet_data["id"], tweet_data["text"]
-            reply_text = fetch_perplexity_analysis(text)
-            delay = random.randint(10, 25)
-            print(f"⏳ Waiting {delay}s before posting reply...")
-            time.sleep(delay)
-            if post_tweet(reply_text, reply_to_id=tid):
-                print(f"✅ Replied to queued tweet {tid} from {profile}")
-            else:
-                print(f"⚠️ Failed to reply {tid}")
-            if not queue[profile]:
-                del queue[profile]
-            save_json(REPLY_QUEUE_FILE, queue)
-            break  # only one per run
+    tid, text, profile = tweet_data["tweet_id"], tweet_data["text"], tweet_data["profile"]
+    if reply_queue.draft_is_fresh(tweet_data) and draft_is_valid(tweet_data["draft"]):
+        reply_text = tweet_data["draft"]
+        print("📝 Using precomputed draft.")
+    else:
+        reply_text = fetch_perplexity_analysis(text)
+    if not reply_text:
+        reply_queue.release(queue, tweet_data["seq"])
+        print(f"⚠️ No analysis for {tid}, kept in queue for retry")
+        print(f"📊 Reply run: served 0, evicted {evicted}")
+        return
+    delay = random.randint(10, 25)
+    print(f"⏳ Waiting {delay}s before posting reply...")
+    time.sleep(delay)
+    served = 0
+    if post_tweet(reply_text, reply_to_id=tid):
+        reply_queue.ack(queue, tweet_data["seq"])
+        served = 1
+        print(f"✅ Replied to queued tweet {tid} from {profile}")
+    else:
+        reply_queue.ack(queue, tweet_data["seq"])  # composed reply now lives in the outbox
+        print(f"⚠️ Failed to reply {tid}, outbox will retry it")
+    print(f"📊 Reply run: served {served}, evicted {evicted}")
 
 # ---------------- Main ----------------
 if __name__ == "__main__":
     print(f"🚀 Bot started in {MODE.upper()} mode.")
     if MODE == "fetch":
-        fetch_and_reply()
+        with profiling.session("apyfi1_fetch"), metrics.run("apyfi1_fetch"), deadline.budget("apyfi1_fetch"):
+            fetch_and_reply()
     elif MODE == "reply":
-        queue_reply()
+        with profiling.session("apyfi1_reply"), metrics.run("apyfi1_reply"), deadline.budget("apyfi1_reply"):
+            queue_reply()
+    elif MODE == "status":
+        reply_queue.print_stats(reply_queue.connect(REPLY_QUEUE_DB))
     else:
-        print("⚠️ Invalid MODE specified. Use 'fetch' or 'reply'.")
+        print("⚠️ Invalid MODE specified. Use 'fetch', 'reply' or 'status'.")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# bench_parse.py
+# Parse throughput of fetchpost2.parse_page_items, in-process vs parse_pool, as the source list grows.
+#
+#   python bench_parse.py                          # synthetic portal pages, 10/25/50/100 sources
+#   python bench_parse.py --pages 50,200 --workers 0,2,4,auto
+#   python bench_parse.py --dir saved_pages/       # real pages saved as *.html (cycled to fill each size)
+
+import os
+import sys
+import time
+import random
+import argparse
+import resource
+from concurrent.futures import ThreadPoolExecutor
+
+import parse_pool
+import fetchpost2
+
+WORDS = ("modi rahul election cabinet china pakistan cricket protest court budget monsoon "
+         "भारत सरकार चुनाव मंत्री संसद क्रिकेट विरोध अदालत").split()
+
+def synthetic_page(i, blocks=350):
+    """Roughly the head of a news portal: headline blocks with standfirst + time, between nav/ad filler."""
+    rnd = random.Random(i)
+    parts = ["<html><head><meta charset='utf-8'><meta name='description' content='Latest news from India and the world'>"
+             "</head><body>"]
+    for b in range(blocks):
+        title = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(6, 14)))
+        sub = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(8, 20)))
+        parts.append(f"<div class='nav'>{'<a href=#>link</a>' * 5}</div>"
+                     f"<article><h3><a href='/story/{i}-{b}'>{title} {b}</a></h3><p>{sub}</p>"
+                     f"<time>{b % 24:02d}:{b % 60:02d} IST</time></article>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+def load_pages(directory):
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith((".html", ".htm")):
+            with open(os.path.join(directory, name), "r", encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+    if not pages:
+        sys.exit(f"no *.html files in {directory}")
+    return pages
+
+def run_once(pages, workers, fetchers):
+    parse_pool.PARSE_WORKERS = workers
+    used = parse_pool.start(len(pages), concurrency=fetchers)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=fetchers) as pool:
+        results = list(pool.map(lambda ip: parse_pool.run(fetchpost2.parse_page_items, ip[1], f"https://bench/{ip[0]}"),
+                                enumerate(pages)))
+    seconds = time.perf_counter() - started
+    parse_pool.shutdown()   # start-up of the next size is measured again, as a real run pays it
+    return used, seconds, sum(len(r) for r in results)
+
+def main():
+    ap = argparse.ArgumentParser(description="parse throughput, in-process vs parse_pool")
+    ap.add_argument("--pages", default="10,25,50,100", help="comma-separated source-list sizes")
+    ap.add_argument("--workers", default="0,auto", help="PARSE_WORKERS values to compare")
+    ap.add_argument("--fetchers", type=int, default=8, help="concurrent fetcher threads handing pages over")
+    ap.add_argument("--dir", help="directory of saved *.html pages instead of synthetic ones")
+    args = ap.parse_args()
+
+    sizes = [int(n) for n in args.pages.split(",")]
+    corpus = load_pages(args.dir) if args.dir else [synthetic_page(i) for i in range(min(max(sizes), 20))]
+    avg_kb = sum(len(p.encode("utf-8")) for p in corpus) / len(corpus) / 1024
+    print(f"{parse_pool.available_cores()} core(s) available, {len(corpus)} distinct page(s) of ~{avg_kb:.0f} KB, "
+          f"{args.fetchers} fetcher thread(s)")
+    print(f"{'pages':>6} {'workers':>8} {'seconds':>8} {'pages/s':>8} {'MB/s':>6} {'items':>7} {'speedup':>8}")
+    for n in sizes:
+        pages = [corpus[i % len(corpus)] for i in range(n)]
+        mb = sum(len(p.encode("utf-8")) for p in pages) / 1024 / 1024
+        baseline = None
+        for workers in args.workers.split(","):
+            used, seconds, items = run_once(pages, workers.strip().lower(), args.fetchers)
+            baseline = baseline or seconds
+            print(f"{n:>6} {used or 'inline':>8} {seconds:>8.2f} {n / seconds:>8.1f} {mb / seconds:>6.1f} "
+                  f"{items:>7} {baseline / seconds:>7.2f}x")
+    print(f"peak RSS (parent) {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+if __name__ == "__main__":
+    main()
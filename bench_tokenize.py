@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# bench_tokenize.py
+# Throughput of tokenizer.tokens vs the old re.findall(r'\w+') on mixed English/Devanagari headlines.
+#
+#   python bench_tokenize.py                         # synthetic corpus, 20k headlines (2k distinct, as stories repeat)
+#   python bench_tokenize.py --size 100000 --repeat 3
+#   python bench_tokenize.py --from scraped_tweets   # titles from saved headline JSON files (cycled to --size)
+
+import os
+import re
+import json
+import time
+import random
+import argparse
+
+import tokenizer
+
+ENGLISH = ("Modi cabinet clears new election reform bill amid opposition protest in Parliament; "
+           "China, Pakistan react as India wins cricket series after police crackdown on corruption scandal").split()
+HINDI = ("प्रधानमंत्री मोदी ने कहा कि चुनाव सुधार विधेयक संसद में पेश होगा, विपक्ष का ज़ोरदार विरोध; "
+         "क्रिकेट में भारत की जीत पर पाकिस्तान और चीन की प्रतिक्रिया, भ्रष्टाचार घोटाले में पुलिस की कार्रवाई हँसी").split()
+
+OLD_RE = re.compile(r"\w+")
+
+def synthetic(size, distinct, seed=7):
+    rnd = random.Random(seed)
+    titles = []
+    for i in range(distinct):
+        kind = i % 3      # English / Hindi / mixed, like the domestic source list
+        words = ENGLISH if kind == 0 else HINDI if kind == 1 else ENGLISH + HINDI
+        titles.append(" ".join(rnd.choice(words) for _ in range(rnd.randint(8, 18))) + f" {i}")
+    return [titles[i % distinct] for i in range(size)]
+
+def from_dir(directory, size):
+    titles = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            try:
+                with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception:
+                continue
+            if isinstance(data, list):
+                titles += [h["title"] for h in data if isinstance(h, dict) and h.get("title")]
+    if not titles:
+        raise SystemExit(f"no headline titles in {directory}/*.json")
+    return [titles[i % len(titles)] for i in range(size)]
+
+def measure(label, fn, corpus, repeat, before=None):
+    best, count = None, 0
+    for _ in range(repeat):
+        if before:
+            before()
+        started = time.perf_counter()
+        count = sum(len(fn(t)) for t in corpus)
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    print(f"{label:<28} {best:>7.3f}s {len(corpus) / best:>11,.0f} titles/s {count / best:>12,.0f} tokens/s "
+          f"{count / len(corpus):>6.1f} tokens/title")
+
+def main():
+    ap = argparse.ArgumentParser(description="tokenizer throughput on mixed-script headlines")
+    ap.add_argument("--size", type=int, default=20000, help="headlines in the corpus")
+    ap.add_argument("--distinct", type=int, default=2000, help="distinct synthetic headlines (cycled to --size)")
+    ap.add_argument("--repeat", type=int, default=5, help="passes per measurement (best is reported)")
+    ap.add_argument("--from", dest="directory", help="directory of saved headline *.json files")
+    args = ap.parse_args()
+
+    corpus = from_dir(args.directory, args.size) if args.directory else synthetic(args.size, args.distinct)
+    distinct = len(set(corpus))
+    devanagari = sum(1 for t in corpus if re.search(r"[ऀ-ॿ]", t))
+    print(f"{len(corpus):,} headlines ({distinct:,} distinct, {devanagari:,} with Devanagari), "
+          f"best of {args.repeat}")
+    measure("re.findall(\\w+) (old)", lambda t: OLD_RE.findall(t.lower()), corpus, args.repeat)
+    measure("tokenizer.tokens, cold", tokenizer.tokens, corpus, args.repeat, before=tokenizer.clear_cache)
+    measure("tokenizer.tokens, memoized", tokenizer.tokens, corpus, args.repeat)
+    measure("tokens(stopwords=True), memo", lambda t: tokenizer.tokens(t, stopwords=True), corpus, args.repeat)
+    print(f"cache: {tokenizer.cache_info()}")
+
+    sample = next((t for t in corpus if re.search(r"[ऀ-ॿ]", t)), None)
+    if sample:
+        print(f"\nsample: {sample[:80]}")
+        print(f"  old:       {OLD_RE.findall(sample.lower())[:12]}")
+        print(f"  tokenizer: {list(tokenizer.tokens(sample))[:12]}")
+
+if __name__ == "__main__":
+    main()
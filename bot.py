@@ -1,24 +1,16 @@
 import os
 import random
 import time
-import requests
-import tweepy
 from datetime import datetime
+import response_cache
+import outbox
+import x_client
+import tweet_text
+import metrics
+import profiling
 
 # Environment variables
 PERPLEXITY_API = os.getenv("PERPLEXITY_API")
-API_KEY = os.getenv("API_KEY")
-API_SECRET = os.getenv("API_SECRET")
-ACCESS_TOKEN = os.getenv("ACCESS_TOKEN")
-ACCESS_SECRET = os.getenv("ACCESS_SECRET")
-
-# X (Twitter) client setup
-client = tweepy.Client(
-    consumer_key=API_KEY,
-    consumer_secret=API_SECRET,
-    access_token=ACCESS_TOKEN,
-    access_token_secret=ACCESS_SECRET
-)
 
 # Prompts with probability (total 12)
 PROMPTS = [
@@ -41,6 +33,7 @@ def choose_prompt():
             return prompt
         upto += weight
 
+@metrics.timed("perplexity")
 def query_perplexity(prompt):
     """Query Perplexity with sonar model."""
     url = "https://api.perplexity.ai/chat/completions"
@@ -55,6 +48,7 @@ def query_perplexity(prompt):
             {"role": "user", "content": prompt}
         ]
     }
+    import requests
     response = requests.post(url, headers=headers, json=data)
     response.raise_for_status()
     text = response.json()["choices"][0]["message"]["content"]
@@ -79,21 +73,38 @@ def clean_text(text):
     # Light human touch
     cleaned = cleaned.replace("है है", "है").replace("हुआ हुआ", "हुआ")
     cleaned = cleaned.strip()
-    return cleaned[:250]
+    return tweet_text.truncate(cleaned, 250)
 
 def post_tweet(text):
     try:
-        client.create_tweet(text=text)
+        outbox.send("bot", text, x_client.create_tweet)
         print(f"[{datetime.now()}] ✅ Posted: {text}")
+        return True
     except Exception as e:
-        print(f"❌ Tweet failed: {e}")
+        print(f"❌ Tweet failed (kept in outbox for retry): {e}")
+        return False
 
 def main():
+    if not outbox.preflight("bot"):
+        return
     prompt = choose_prompt()
     print(f"🎯 Prompt: {prompt}")
-    text = query_perplexity(prompt)
+    cache = response_cache.load_cache("bot")
+    is_posted = lambda raw: outbox.has_text("bot", clean_text(raw))
+    text = response_cache.get_cached(cache, prompt, is_posted)
+    if text:
+        print("♻️ Using cached response for this prompt.")
+    else:
+        text = query_perplexity(prompt)
+        response_cache.store(cache, prompt, text, is_posted)
+    profiling.snapshot("before compose")
     final_text = clean_text(text)
-    post_tweet(final_text)
+    profiling.snapshot("after compose")
+    if post_tweet(final_text):
+        response_cache.mark_used(cache, prompt, text)
+    response_cache.save_cache(cache)
+    print(response_cache.stats_line(cache))
 
 if __name__ == "__main__":
-    main()
+    with profiling.session("bot"), metrics.run("bot"):
+        main()
@@ -1,11 +1,16 @@
 import os  
-import requests  
-import tweepy  
 import re  
 import json  
 import random  
 from datetime import datetime, timedelta  
 import sys  
+import response_cache
+import outbox
+import x_client
+import tweet_text
+import metrics
+import profiling
+import deadline
 
 # ---------------- Environment Variables ----------------  
 PERPLEXITY_API = os.getenv("PERPLEXITY_API")  
@@ -15,7 +20,8 @@ ACCESS_TOKEN = os.getenv("ACCESS_TOKEN")
 ACCESS_SECRET = os.getenv("ACCESS_SECRET")  
 
 # ---------------- Files ----------------  
-POSTED_FILE = "posted_news.json"  
+POSTED_LOG_FILE = "posted_news.jsonl"
+POSTED_FILE = "posted_news.json"  # legacy format, migrated into POSTED_LOG_FILE
 LAST_CATEGORY_FILE = "last_category.txt"  
 
 # ---------------- Categories ----------------  
@@ -32,19 +38,13 @@ CATEGORIES = [
 def get_prompt(category):
     return f"Give today's most controversy and latest news regarding '{category}', exactly in 260 characters, in Hinglish, only news ( no mention of word count or date , headline, source etc.) just news, sound like a human."
 
-# ---------------- Twitter Setup ----------------  
-client = tweepy.Client(  
-    consumer_key=API_KEY,  
-    consumer_secret=API_SECRET,  
-    access_token=ACCESS_TOKEN,  
-    access_token_secret=ACCESS_SECRET  
-)  
-
 # ---------------- Global Flag ----------------  
 DRY_RUN = False  # Set True for manual (no tweet)
+_posted_store = None  # loaded lazily by _load_posted_store()
 
 # ---------------- Helper Functions ----------------  
 
+@metrics.timed("perplexity")
 def fetch_news(prompt):  
     url = "https://api.perplexity.ai/chat/completions"  
     headers = {  
@@ -59,8 +59,9 @@ def fetch_news(prompt):
         ],  
         "max_tokens": 180  
     }  
+    import requests  # deferred: runs outside posting hours never need it
     try:  
-        response = requests.post(url, headers=headers, json=data, timeout=20)  
+        response = requests.post(url, headers=headers, json=data, timeout=deadline.clamp(20))  
         if response.status_code != 200:  
             print(f"❌ API returned status {response.status_code}")  
             return ""  
@@ -71,24 +72,29 @@ def fetch_news(prompt):
         print("❌ Fetch error:", e)  
         return ""  
 
+def already_posted(raw_news, posted):
+    news_list = split_news(raw_news)
+    return bool(news_list) and all(n in posted or outbox.has_text("bot6", n) for n in news_list)
+
+def fetch_news_cached(cache, prompt):
+    """fetch_news with a prompt/time-bucket cache; skips responses already posted or in the outbox."""
+    posted = load_posted()
+    is_posted = lambda raw: already_posted(raw, posted)
+    raw_news = response_cache.get_cached(cache, prompt, is_posted)
+    if raw_news:
+        print(f"[{datetime.now()}] ♻️ Using cached response for this prompt.")
+    else:
+        raw_news = fetch_news(prompt)
+        if raw_news:
+            response_cache.store(cache, prompt, raw_news, is_posted)
+    return raw_news
+
 def split_news(raw_news):  
     if not raw_news:  
         return []  
     raw_news = re.sub(r'\[\d+\](?:\[\d+\])*', '', raw_news)  
     raw_news = re.sub(r'\s+', ' ', raw_news).strip()  
-    if len(raw_news) > 273:  
-        trimmed = raw_news[:273].strip()  
-        last_sentence = max(trimmed.rfind('।'), trimmed.rfind('?'), trimmed.rfind('!'), -1)  
-        if last_sentence > 200:  
-            raw_news = trimmed[:last_sentence + 1].strip()  
-        else:  
-            last_space = trimmed.rfind(' ')  
-            if last_space > 200:  
-                raw_news = trimmed[:last_space].strip()  
-            else:  
-                raw_news = trimmed  
-        if raw_news[-1] not in {'।', '.', '?', '!'}:  
-            raw_news += "..."  
+    raw_news = tweet_text.truncate(raw_news, min_ratio=0.7)
     return [raw_news] if len(raw_news) >= 20 else []  
 
 def save_news(news_list, filename):  
@@ -96,55 +102,115 @@ def save_news(news_list, filename):
         for n in news_list:  
             f.write(n + "\n")  
 
-def load_posted():  
-    if os.path.exists(POSTED_FILE):  
-        with open(POSTED_FILE, "r", encoding="utf-8") as f:  
-            try:  
-                return json.load(f)  
-            except:  
-                return {}  
-    return {}  
-
-def save_posted(posted):  
-    with open(POSTED_FILE, "w", encoding="utf-8") as f:  
-        json.dump(posted, f, ensure_ascii=False, indent=2)  
-
-def cleanup_posted(days=5):  
-    posted = load_posted()  
-    cutoff = datetime.utcnow() + timedelta(hours=5, minutes=30) - timedelta(days=days)  
-    new_posted = {k: v for k, v in posted.items() if datetime.strptime(v, "%Y-%m-%d") >= cutoff}  
-    save_posted(new_posted)  
+def _today_ist():
+    return (datetime.utcnow() + timedelta(hours=5, minutes=30)).strftime("%Y-%m-%d")
+
+def _index_posted(store, news, day):
+    store["index"][news] = day
+    store["days"].setdefault(day, set()).add(news)
+
+def _load_posted_store():
+    """Load the posted log once per run into a hash index plus per-day partitions."""
+    global _posted_store
+    if _posted_store is not None:
+        return _posted_store
+    store = {"index": {}, "days": {}, "pending": [], "compact": False}
+    if os.path.exists(POSTED_LOG_FILE):
+        with open(POSTED_LOG_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                    _index_posted(store, rec["news"], rec["day"])
+                except Exception:
+                    store["compact"] = True  # drop torn/corrupt lines on next write
+    elif os.path.exists(POSTED_FILE):
+        # one-time migration from the old posted_news.json dict
+        with open(POSTED_FILE, "r", encoding="utf-8") as f:
+            try:
+                legacy = json.load(f)
+            except:
+                legacy = {}
+        for news, day in legacy.items():
+            _index_posted(store, news, day)
+        store["compact"] = True
+    _posted_store = store
+    return store
+
+def clear_state():
+    """Forget the loaded posted log; the daemon calls this before each run so it re-reads the file."""
+    global _posted_store
+    _posted_store = None
+
+def load_posted():
+    return _load_posted_store()["index"]
+
+def mark_posted(news, day=None):
+    store = _load_posted_store()
+    day = day or _today_ist()
+    _index_posted(store, news, day)
+    store["pending"].append({"news": news, "day": day})
+
+def cleanup_posted(days=5):
+    store = _load_posted_store()
+    cutoff = (datetime.utcnow() + timedelta(hours=5, minutes=30) - timedelta(days=days)).strftime("%Y-%m-%d")
+    expired = [d for d in store["days"] if d <= cutoff]
+    for day in expired:
+        for news in store["days"].pop(day):
+            if store["index"].get(news) == day:
+                del store["index"][news]
+    if expired:
+        store["compact"] = True
+
+def flush_posted():
+    """Single durable write per run: append new entries, or compact if partitions expired."""
+    store = _load_posted_store()
+    if store["compact"]:
+        tmp = POSTED_LOG_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for news, day in store["index"].items():
+                f.write(json.dumps({"news": news, "day": day}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, POSTED_LOG_FILE)
+    elif store["pending"]:
+        with open(POSTED_LOG_FILE, "a", encoding="utf-8") as f:
+            for rec in store["pending"]:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    store["pending"] = []
+    store["compact"] = False
 
 def post_tweet(text):  
     global DRY_RUN  
     if not DRY_RUN and (API_KEY is None or API_SECRET is None or ACCESS_TOKEN is None or ACCESS_SECRET is None):  
         print("❌ Twitter env vars missing!")  
         return False  
-    print(f"[{datetime.now()}] 🔄 Attempting to post ({len(text)} chars): {text[:50]}...")  
+    print(f"[{datetime.now()}] 🔄 Attempting to post ({tweet_text.weighted_length(text)} weighted chars): {text[:50]}...")  
     if DRY_RUN:  
         print(f"[{datetime.now()}] ℹ️ DRY RUN: Would post tweet.")  
-        return True  
+        return False  # nothing went out: the news and its cached response stay unused
     try:  
-        response = client.create_tweet(text=text)  
-        print(f"[{datetime.now()}] ✅ Posted successfully! Tweet ID: {response.data['id']}")  
+        tweet_id = outbox.send("bot6", text, x_client.create_tweet)
+        print(f"[{datetime.now()}] ✅ Posted successfully! Tweet ID: {tweet_id}")  
         return True  
     except Exception as e:  
-        print(f"❌ Error posting tweet: {e}")  
+        print(f"❌ Error posting tweet (kept in outbox for retry): {e}")  
         return False  
 
 def post_next(news_list=None):  
-    posted = load_posted()  
+    """Post the first news not posted yet; True once a tweet went out."""
+    posted = load_posted()
     all_news = news_list if news_list else []
     for news in all_news:    
         if news not in posted:    
-            if post_tweet(news):    
-                posted[news] = (datetime.utcnow() + timedelta(hours=5, minutes=30)).strftime("%Y-%m-%d")    
-                save_posted(posted)    
-            return    
+            if post_tweet(news):
+                mark_posted(news)
+                return True
+            return False
     if all_news:    
         fallback_news = random.choice(all_news)    
         print(f"[{datetime.now()}] ℹ️ All news posted. Posting random again.")    
-        post_tweet(fallback_news)  
+        return post_tweet(fallback_news)
+    return False
 
 def get_random_category():
     last_cat = None
@@ -159,39 +225,57 @@ def get_random_category():
         f.write(selected)
     return selected
 
-# ---------------- Main Auto Mode ----------------
-if __name__ == "__main__":
-    mode = sys.argv[1].lower() if len(sys.argv) > 1 else "auto"
+# ---------------- Main ----------------
+def main(mode="auto", category=None):
+    global DRY_RUN
     cleanup_posted(days=5)
 
     if mode == "manual":
         DRY_RUN = True
-        category_arg = sys.argv[2] if len(sys.argv) > 2 else random.choice(CATEGORIES)
+        category_arg = category or random.choice(CATEGORIES)
         print(f"Manual fetch for category: {category_arg}")
-        raw_news = fetch_news(get_prompt(category_arg))
+        cache = response_cache.load_cache("bot6")
+        raw_news = fetch_news_cached(cache, get_prompt(category_arg))
         news_list = split_news(raw_news)
         if news_list:
             filename = f"{category_arg.replace(' & ', '_').replace(' ', '_').lower()}_news.txt"
             save_news(news_list, filename)
             post_next(news_list)
-        sys.exit()
+        response_cache.save_cache(cache)
+        print(response_cache.stats_line(cache))
+        flush_posted()
+        return
 
+    DRY_RUN = False
     now_ist = datetime.utcnow() + timedelta(hours=5, minutes=30)
     hour = now_ist.hour
 
     # Post hourly between 9 AM – 1 AM IST
-    if 9 <= hour <= 23 or 0 <= hour <= 1:
+    if not (9 <= hour <= 23 or 0 <= hour <= 1):
+        print(f"[{now_ist}] 💤 Outside posting hours (9 AM–1 AM IST). No post.")
+    elif outbox.preflight("bot6"):
         selected_category = get_random_category()
         print(f"[{now_ist}] 🔄 Fetching news for '{selected_category}'")
         prompt = get_prompt(selected_category)
-        raw_news = fetch_news(prompt)
+        cache = response_cache.load_cache("bot6")
+        raw_news = fetch_news_cached(cache, prompt)
         if not raw_news:
             print(f"⚠️ API returned empty news for {selected_category}")
         else:
+            profiling.snapshot("before parse")
             news_list = split_news(raw_news)
+            profiling.snapshot("after parse")
             if news_list:
                 filename = f"{selected_category.replace(' & ', '_').replace(' ', '_').lower()}_news.txt"
                 save_news(news_list, filename)
-                post_next(news_list)
-    else:
-        print(f"[{now_ist}] 💤 Outside posting hours (9 AM–1 AM IST). No post.")
+                if post_next(news_list):
+                    response_cache.mark_used(cache, prompt, raw_news)
+        response_cache.save_cache(cache)
+        print(response_cache.stats_line(cache))
+
+    flush_posted()
+
+if __name__ == "__main__":
+    with profiling.session("bot6"), metrics.run("bot6"), deadline.budget("bot6"):
+        main(sys.argv[1].lower() if len(sys.argv) > 1 else "auto",
+             sys.argv[2] if len(sys.argv) > 2 else None)
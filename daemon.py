@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import random
+import importlib
+import traceback
+from datetime import datetime, timedelta, timezone
+
+import state_store
+import metrics
+import fetch_memo
+import deadline
+import source_health
+import page_fingerprints
+
+# ---------------- Files ----------------
+STATUS_FILE = "daemon_status.json"   # health/status, rewritten every heartbeat
+
+# ---------------- Settings ----------------
+IST = timezone(timedelta(hours=5, minutes=30))
+JITTER_MINUTES = int(os.getenv("DAEMON_JITTER_MINUTES", "15"))  # same ± window the workflows sleep for
+HEARTBEAT_SECONDS = 60
+
+# job name -> (module, entry point, IST "HH:MM" slots); mirrors the cron schedules in .github/workflows
+JOBS = {
+    "bot6": ("bot6", "main", ["09:00", "12:15", "16:00", "18:00", "19:30", "20:30", "21:40", "22:50", "23:55"]),
+    "apyfi1_fetch": ("apyfi1", "fetch_and_reply", ["17:00", "18:40", "20:00", "21:10", "21:50", "22:30", "23:00"]),
+    # reply mode has no cron (workflow_dispatch only); one reply between fetches drains the queue
+    "apyfi1_reply": ("apyfi1", "queue_reply", ["17:45", "19:20", "20:35", "21:30", "22:10", "22:45", "23:30"]),
+}
+
+# ---------------- Scheduling ----------------
+def next_run(slots, after):
+    """(jittered run time, slot) for the first IST slot strictly after `after`."""
+    for day in (0, 1):
+        base = (after + timedelta(days=day)).date()
+        for slot in sorted(slots):
+            hh, mm = map(int, slot.split(":"))
+            at = datetime(base.year, base.month, base.day, hh, mm, tzinfo=IST)
+            if at > after:
+                jitter = timedelta(seconds=random.uniform(-JITTER_MINUTES * 60, JITTER_MINUTES * 60))
+                return at + jitter, at
+
+# ---------------- Status ----------------
+def write_status(status):
+    status["heartbeat"] = datetime.now(IST).isoformat()
+    state_store.write_json_atomic(STATUS_FILE, status)
+
+def print_status():
+    """Print the status file; exit code 1 if the heartbeat is stale (for health checks)."""
+    status = state_store.read_json(STATUS_FILE)
+    if not status:
+        print(f"⚠️ No daemon status in {STATUS_FILE}.")
+        return 1
+    age = (datetime.now(IST) - datetime.fromisoformat(status["heartbeat"])).total_seconds()
+    print(f"🫀 Daemon pid {status['pid']}, started {status['started']}, heartbeat {int(age)}s ago.")
+    for name, job in status.get("jobs", {}).items():
+        print(f"   {name:<12} next {job.get('next_run')}  last {job.get('last_result', '-')} "
+              f"({job.get('last_duration', 0)}s)  runs {job.get('runs', 0)}  failures {job.get('failures', 0)}")
+    return 0 if age < HEARTBEAT_SECONDS * 3 else 1
+
+# ---------------- Jobs ----------------
+def warm_up(names):
+    """Import every job module once (tweepy, bs4, googletrans, apify_client, ...) and build the X client."""
+    for name in names:
+        importlib.import_module(JOBS[name][0])
+    try:
+        import x_client
+        x_client.get_client()
+    except Exception as e:
+        print(f"⚠️ Could not pre-build X client: {e}")
+
+def run_job(name, job_status):
+    module_name, entry, _ = JOBS[name]
+    module = importlib.import_module(module_name)   # already warm; returns the cached module
+    started = time.time()
+    job_status["last_start"] = datetime.now(IST).isoformat()
+    print(f"▶️ [{job_status['last_start']}] Running {name} ({module_name}.{entry})")
+    fetch_memo.clear()   # fetched pages are run-scoped
+    # state files may have been rewritten by cron runs or other processes since the last job
+    source_health.clear()
+    page_fingerprints.clear()
+    if hasattr(module, "clear_state"):
+        module.clear_state()
+    try:
+        with metrics.run(name), deadline.budget(name):
+            getattr(module, entry)()
+        job_status["last_result"] = "ok"
+        job_status.pop("last_error", None)
+    except (Exception, SystemExit) as e:
+        traceback.print_exc()
+        job_status["last_result"] = "error"
+        job_status["last_error"] = repr(e)[:500]
+        job_status["failures"] = job_status.get("failures", 0) + 1
+    job_status["runs"] = job_status.get("runs", 0) + 1
+    job_status["last_duration"] = round(time.time() - started, 1)
+    print(f"⏹️ {name} finished: {job_status['last_result']} in {job_status['last_duration']}s")
+
+def serve(names):
+    warm_up(names)
+    now = datetime.now(IST)
+    # a slot whose jitter window is still open counts as upcoming
+    schedule = {name: next_run(JOBS[name][2], now - timedelta(minutes=JITTER_MINUTES)) for name in names}
+    status = {"pid": os.getpid(), "started": now.isoformat(), "jobs": {name: {} for name in names}}
+    print(f"🕰️ Daemon started with jobs: {', '.join(names)}")
+    while True:
+        for name, (at, _) in schedule.items():
+            status["jobs"][name]["next_run"] = at.isoformat()
+        write_status(status)
+        name, (at, slot) = min(schedule.items(), key=lambda kv: kv[1][0])
+        wait = (at - datetime.now(IST)).total_seconds()
+        if wait > 0:
+            time.sleep(min(wait, HEARTBEAT_SECONDS))
+            continue
+        status["jobs"][name]["next_run"] = "running"
+        write_status(status)
+        run_job(name, status["jobs"][name])
+        schedule[name] = next_run(JOBS[name][2], max(slot, datetime.now(IST) - timedelta(minutes=JITTER_MINUTES)))
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["status"]:
+        sys.exit(print_status())
+    unknown = [a for a in args if a not in JOBS]
+    if unknown:
+        print(f"⚠️ Unknown job(s): {', '.join(unknown)}. Available: {', '.join(JOBS)}")
+        sys.exit(2)
+    serve(args or list(JOBS))
@@ -0,0 +1,89 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+import metrics
+
+# ---------------- Settings ----------------
+RUN_BUDGET_SECONDS = int(os.getenv("RUN_BUDGET_SECONDS", str(40 * 60)))   # inside the 45-min job timeout
+POST_RESERVE_SECONDS = int(os.getenv("POST_RESERVE_SECONDS", "90"))      # always left for posting
+MIN_CALL_TIMEOUT = 1
+
+_started = None
+_budget = None
+_reserve = None
+
+# ---------------- Budget ----------------
+def start(budget=None, reserve=None):
+    global _started, _budget, _reserve
+    _started = time.time()
+    _budget = RUN_BUDGET_SECONDS if budget is None else budget
+    _reserve = POST_RESERVE_SECONDS if reserve is None else reserve
+
+def remaining():
+    """Seconds until the run deadline (infinite when no budget is active)."""
+    if _started is None:
+        return float("inf")
+    return _budget - (time.time() - _started)
+
+def remaining_for_work():
+    """Seconds left for everything except posting, which keeps its reserved slice."""
+    return remaining() - (_reserve or 0)
+
+def expired():
+    return remaining_for_work() <= 0
+
+def clamp(timeout):
+    """Shrink a per-call timeout so it cannot run into the posting reserve."""
+    left = remaining_for_work()
+    if left == float("inf"):
+        return timeout
+    return max(MIN_CALL_TIMEOUT, min(timeout, left))
+
+def wait_secs():
+    """Whole seconds of work time left, or None without a budget (for APIs taking wait_secs)."""
+    left = remaining_for_work()
+    return None if left == float("inf") else max(MIN_CALL_TIMEOUT, int(left))
+
+def call(fn, *args, timeout=None, **kwargs):
+    """fn(*args, **kwargs) with a hard wall-clock limit (clamped to the budget); TimeoutError if it overruns.
+
+    For clients without their own timeout (googletrans). The call runs in a daemon thread,
+    so a hung one is abandoned rather than blocking the run or interpreter exit.
+    """
+    limit = clamp(timeout if timeout is not None else remaining_for_work())
+    result = {}
+    def target():
+        try:
+            result["value"] = fn(*args, **kwargs)
+        except BaseException as e:
+            result["error"] = e
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(None if limit == float("inf") else limit)
+    if worker.is_alive():
+        metrics.count("deadline_timeout")
+        raise TimeoutError(f"{getattr(fn, '__name__', 'call')} exceeded {limit:.0f}s")
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+# ---------------- Run wrapper ----------------
+@contextmanager
+def budget(script, seconds=None, reserve=None):
+    """Start the run deadline and report how much of it each metrics stage used."""
+    start(seconds, reserve)
+    try:
+        yield
+    finally:
+        report(script)
+        global _started
+        _started = None
+
+def report(script):
+    used = time.time() - _started
+    stages = sorted(metrics.stage_totals().items(), key=lambda kv: -kv[1])
+    parts = [f"{name} {seconds:.1f}s ({seconds / _budget:.0%})" for name, seconds in stages]
+    print(f"⏳ {script}: used {used:.0f}s of {_budget}s budget ({used / _budget:.0%}), "
+          f"{_reserve}s reserved for posting" + (f" | {', '.join(parts)}" if parts else ""))
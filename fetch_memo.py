@@ -0,0 +1,53 @@
+import os
+import time
+import threading
+from concurrent.futures import Future
+
+import metrics
+
+# ---------------- Settings ----------------
+# how long a fetched+parsed page is reused within a run; with the default the
+# morning and evening buckets share one snapshot, set 0 to fetch each separately
+TTL_SECONDS = int(os.getenv("FETCH_MEMO_TTL_SECONDS", "900"))
+
+_lock = threading.Lock()
+_entries = {}    # key -> (stored_at, value)
+_inflight = {}   # key -> Future of the caller currently loading it
+
+# ---------------- Memo ----------------
+def get(key, loader, ttl=None, cache_if=None):
+    """loader() for key, run at most once per ttl; concurrent callers wait for the one in flight.
+
+    cache_if(value) -> False keeps a result out of the memo (e.g. an empty page, so a retry refetches).
+    """
+    ttl = TTL_SECONDS if ttl is None else ttl
+    with _lock:
+        entry = _entries.get(key)
+        if entry and time.time() - entry[0] < ttl:
+            metrics.count("memo_hit")
+            return entry[1]
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = Future()
+    if not owner:
+        metrics.count("memo_wait")
+        return future.result()
+    try:
+        value = loader()
+    except BaseException as e:
+        with _lock:
+            _inflight.pop(key, None)
+        future.set_exception(e)
+        raise
+    with _lock:
+        if cache_if is None or cache_if(value):
+            _entries[key] = (time.time(), value)
+        _inflight.pop(key, None)
+    future.set_result(value)
+    return value
+
+def clear():
+    """Forget everything; called at the start of a run so nothing leaks between daemon runs."""
+    with _lock:
+        _entries.clear()
@@ -1,13 +1,19 @@
 import os
 import json
 import random
-import re
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
-from collections import Counter
-import tweepy
-from googletrans import Translator
+import outbox
+import x_client
+import tweet_text
+import state_store
+import headline_sampler
+import metrics
+import tokenizer
+import headline_scoring
+import profiling
+import http_fetch
+import fetch_memo
+import page_fingerprints
 
 # ------------------------ Paths ------------------------
 base_dir = os.path.join(os.getcwd(), "scraped_tweets")
@@ -17,26 +23,8 @@ evening_file = os.path.join(base_dir, "evening.json")
 ir_file = os.path.join(base_dir, "international.json")
 posted_today_file = "posted_today.json"
 
-# ------------------------ Twitter API v2 ------------------------
-BEARER_TOKEN = os.environ.get('BEARER_TOKEN')
-API_KEY = os.environ.get('API_KEY')
-API_SECRET = os.environ.get('API_SECRET')
-ACCESS_TOKEN = os.environ.get('ACCESS_TOKEN')
-ACCESS_SECRET = os.environ.get('ACCESS_SECRET')
-
-client = tweepy.Client(
-    consumer_key=API_KEY,
-    consumer_secret=API_SECRET,
-    access_token=ACCESS_TOKEN,
-    access_token_secret=ACCESS_SECRET
-)
-
-# ------------------------ Load posted_today ------------------------
-if os.path.exists(posted_today_file):
-    with open(posted_today_file, "r", encoding="utf-8") as f:
-        posted_today = json.load(f)
-else:
-    posted_today = {"prefix": {}, "emoji": {}, "IR_count": 0}
+# ------------------------ posted_today state ------------------------
+state = state_store.StateFile(posted_today_file, ("prefix", "emoji", "IR", "title"))
 
 # ------------------------ Config ------------------------
 headers = {
@@ -45,18 +33,6 @@ headers = {
                   "Chrome/127.0.0.1 Safari/537.36"
 }
 
-keywords = [
-    "bjp", "congress", "rahul", "modi", "india", "election", "violence",
-    "lynching", "corruption", "protest", "china", "pakistan", "usa",
-    "cricket", "sports", "discrimination", "reservation", "scandal"
-]
-
-topic_weights = {
-    "BJP": 3, "Congress": 3, "corruption": 3, "lynching": 3,
-    "cricket": 2, "sports": 1, "China": 2, "Pakistan": 2,
-    "USA": 2, "election": 3, "violence": 2, "discrimination": 2
-}
-
 prefixes = [
     "Breaking", "Alert", "Exclusive", "Shocking", "Controversial",
     "Must Read", "Urgent", "Scandal", "Truth", "Explosive"
@@ -64,24 +40,39 @@ prefixes = [
 emojis = ["🚨","🔥","⚡","💥","⚠️","📰","💣"]
 synonyms = {}  # optional replacements
 keyword_impact_map = {}  # optional impact mapping
-translator = Translator()
+_translator = None  # built on first use by get_translator()
+
+def get_translator():
+    global _translator
+    if _translator is None:
+        from googletrans import Translator
+        _translator = Translator()
+    return _translator
 
 # ------------------------ Scraping functions ------------------------
 def extract_headlines(url):
-    headlines = []
+    items = fetch_memo.get(("headlines", url), lambda: _extract_headlines(url), cache_if=bool)
+    return [dict(h) for h in items]
+
+@metrics.timed("scrape")
+def _extract_headlines(url):
     try:
-        r = requests.get(url, headers=headers, timeout=10)
-        if r.status_code != 200:
-            print(f"⚠️ {url} -> HTTP {r.status_code}")
-            return []
-        soup = BeautifulSoup(r.text, "html.parser")
-        tags = soup.find_all(["h1", "h2", "h3", "h4", "p"])
-        for t in tags:
-            text = t.get_text(strip=True)
-            if 25 < len(text) < 300:
-                headlines.append({"title": text, "url": url})
+        html_text = http_fetch.fetch_text(url, headers=headers)
+        return page_fingerprints.items_for("fetchpost1", url, html_text, lambda text: parse_headlines(text, url),
+                                           tags=page_fingerprints.HEADING_TAGS + ("p",))
     except Exception as e:
         print(f"❌ {url}: {e}")
+        return []
+
+def parse_headlines(html_text, url):
+    from bs4 import BeautifulSoup
+    headlines = []
+    soup = BeautifulSoup(html_text, "html.parser")
+    tags = soup.find_all(["h1", "h2", "h3", "h4", "p"])
+    for t in tags:
+        text = t.get_text(strip=True)
+        if 25 < len(text) < 300:
+            headlines.append({"title": text, "url": url})
     return headlines
 
 def scrape_domestic():
@@ -111,22 +102,6 @@ def scrape_international():
         all_h += extract_headlines(url)
     return all_h[:50]
 
-def assign_scores(headlines):
-    all_words = []
-    for h in headlines:
-        all_words += re.findall(r'\w+', h['title'].lower())
-    freq = Counter(all_words)
-    for h in headlines:
-        h_score = 1
-        for w in re.findall(r'\w+', h['title'].lower()):
-            if w in keywords:
-                h_score += freq[w]
-        for k, v in topic_weights.items():
-            if k.lower() in h['title'].lower():
-                h_score += v
-        h['score'] = h_score
-    return headlines
-
 def save_json(headlines, file_path):
     top_items = sorted(headlines, key=lambda x: x['score'], reverse=True)[:max(15, len(headlines)//3)]
     with open(file_path, "w", encoding="utf-8") as f:
@@ -144,17 +119,11 @@ def load_headlines(file_path):
     except json.JSONDecodeError:
         return []
 
-def pick_headline_weighted(headlines):
-    weighted = [h for h in headlines if h.get('score',0) > 0]
-    if weighted:
-        return random.choices(weighted, weights=[h['score'] for h in weighted], k=1)[0]
-    return None
-
 def get_reason_impact(headline_obj, chance=0.2):
     reason = headline_obj.get("reason")
     impact = headline_obj.get("impact")
     if not reason and not impact and random.random() <= chance:
-        words = re.findall(r'\w+', headline_obj['title'].lower())
+        words = tokenizer.tokens(headline_obj['title'])
         reason_kw = next((k for k in keyword_impact_map if k.lower() in words), None)
         reason = f"इस विकास के कारण {reason_kw}" if reason_kw else "हालिया घटनाओं के कारण"
         impact_kw = next((k for k in keyword_impact_map if k.lower() in words), None)
@@ -162,13 +131,13 @@ def get_reason_impact(headline_obj, chance=0.2):
     return reason, impact
 
 def advanced_rephrase_specific(headline, reason, impact):
-    available_prefixes = [p for p in prefixes if posted_today["prefix"].get(p,0)<2]
+    available_prefixes = [p for p in prefixes if state.usage["prefix"].get(p)<2]
     prefix = random.choice(available_prefixes) if available_prefixes else random.choice(prefixes)
-    posted_today["prefix"][prefix] = posted_today["prefix"].get(prefix,0)+1
+    state.usage["prefix"].add(prefix)
 
-    available_emojis = [e for e in emojis if posted_today["emoji"].get(e,0)<2]
+    available_emojis = [e for e in emojis if state.usage["emoji"].get(e)<2]
     emoji = random.choice(available_emojis) if available_emojis else random.choice(emojis)
-    posted_today["emoji"][emoji] = posted_today["emoji"].get(emoji,0)+1
+    state.usage["emoji"].add(emoji)
 
     words = headline.split()
     new_words = []
@@ -191,30 +160,32 @@ def advanced_rephrase_specific(headline, reason, impact):
             new_title += f"{impact_text}।"
 
     full_text = f"{prefix} {emoji} {new_title}"
-    if len(full_text) > 280:
-        full_text = full_text[:277] + "..."
+    full_text = tweet_text.truncate(full_text)
     
     # Translate to Hindi
     try:
-        full_text_hi = translator.translate(full_text, dest='hi').text
+        with metrics.timer("translate"):
+            full_text_hi = get_translator().translate(full_text, dest='hi').text
     except:
         full_text_hi = full_text
 
-    return full_text_hi
+    return tweet_text.truncate(full_text_hi)
 
 def post_tweet(text):
     try:
-        client.create_tweet(text=text)
+        outbox.send("fetchpost1", text, x_client.create_tweet)
         print(f"[{datetime.now()}] ✅ Tweet posted successfully")
     except Exception as e:
-        print(f"[{datetime.now()}] ❌ Failed to post tweet: {e}")
+        print(f"[{datetime.now()}] ❌ Failed to post tweet (kept in outbox for retry): {e}")
 
 # ------------------------ Main ------------------------
 def main():
+    if not outbox.preflight("fetchpost1"):
+        return
     # Fetch news first
-    morning_headlines = assign_scores(scrape_domestic())
-    evening_headlines = assign_scores(scrape_domestic())
-    ir_headlines = assign_scores(scrape_international())
+    morning_headlines = headline_scoring.assign_scores(scrape_domestic())
+    evening_headlines = headline_scoring.assign_scores(scrape_domestic())
+    ir_headlines = headline_scoring.assign_scores(scrape_international())
 
     if morning_headlines:
         save_json(morning_headlines, morning_file)
@@ -235,36 +206,28 @@ def main():
         print(f"[ERROR {datetime.now()}] No headlines available at all. Exiting.")
         return
 
-    tweet_obj = None
-    tries = 0
-
-    while tries < 10:
-        candidate = pick_headline_weighted(all_headlines)
-        if not candidate:
-            break
-        if candidate.get('topic') == "International Relations" and posted_today.get("IR_count", 0) >= 3:
-            tries += 1
-            continue
-        tweet_obj = candidate
-        break
-
+    sampler = headline_sampler.HeadlineSampler(all_headlines, ir_capped=state.usage["IR"].get("count") >= 3,
+                                               posted=state.usage["title"])
+    print(f"[DEBUG {datetime.now()}] {sampler.report()}")
+    tweet_obj = sampler.draw()
     if not tweet_obj:
-        print(f"[WARN {datetime.now()}] Weighted pick failed, using fallback headline")
-        tweet_obj = random.choice(all_headlines)
+        print(f"[WARN {datetime.now()}] No eligible headline (IR cap reached / all already posted). Exiting.")
+        return
 
     reason, impact = get_reason_impact(tweet_obj)
-    tweet_text = advanced_rephrase_specific(tweet_obj['title'], reason, impact)
-    print(f"[DEBUG {datetime.now()}] Selected headline: {tweet_text[:100]}...")
+    text = advanced_rephrase_specific(tweet_obj['title'], reason, impact)
+    print(f"[DEBUG {datetime.now()}] Selected headline: {text[:100]}...")
 
-    post_tweet(tweet_text)
+    post_tweet(text)
 
+    state.usage["title"].add(tweet_obj['title'].strip())
     if tweet_obj.get('topic') == "International Relations":
-        posted_today["IR_count"] = posted_today.get("IR_count", 0) + 1
+        state.usage["IR"].add("count")
 
-    with open(posted_today_file, "w", encoding="utf-8") as f:
-        json.dump(posted_today, f, ensure_ascii=False, indent=2)
+    state.save()
 
 if __name__ == "__main__":
-    main()
+    with profiling.session("fetchpost1"), metrics.run("fetchpost1"):
+        main()
 
 
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # fetchpost_ultimate.py
 # Ultimate single-file scraper + human-like tweet composer + poster (Hindi final tweets)
-# Posting method unchanged: uses tweepy.Client.create_tweet(...)
+# Posting goes through the shared outbox + rate-limit-aware x_client
 
 import os
 import re
@@ -11,13 +11,24 @@ import random
 import html
 import traceback
 from datetime import datetime, timedelta
-from collections import Counter, defaultdict
-
-import requests
-from requests.adapters import HTTPAdapter, Retry
-from bs4 import BeautifulSoup
-from googletrans import Translator
-import tweepy
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import outbox
+import x_client
+import tweet_text
+import state_store
+import headline_sampler
+import metrics
+import tokenizer
+import headline_scoring
+import profiling
+import http_fetch
+import fetch_memo
+import page_fingerprints
+import parse_pool
+import source_health
+import deadline
 
 # ------------------------ Configuration ------------------------
 # Files & directories
@@ -28,31 +39,9 @@ EVENING_FILE = os.path.join(BASE_DIR, "evening.json")
 IR_FILE = os.path.join(BASE_DIR, "international.json")
 POSTED_FILE = os.path.join(BASE_DIR, "posted_today.json")
 
-# Twitter credentials - posting method unchanged: client.create_tweet(...)
-API_KEY = os.environ.get("API_KEY")
-API_SECRET = os.environ.get("API_SECRET")
-ACCESS_TOKEN = os.environ.get("ACCESS_TOKEN")
-ACCESS_SECRET = os.environ.get("ACCESS_SECRET")
-BEARER_TOKEN = os.environ.get("BEARER_TOKEN")  # optional
-
-# create Tweepy Client (we will use .create_tweet)
-client = tweepy.Client(
-    consumer_key=API_KEY,
-    consumer_secret=API_SECRET,
-    access_token=ACCESS_TOKEN,
-    access_token_secret=ACCESS_SECRET
-)
-
-# HTTP session with retries
-session = requests.Session()
-retries = Retry(total=2, backoff_factor=0.8, status_forcelist=[429,500,502,503,504])
-session.mount("https://", HTTPAdapter(max_retries=retries))
-session.headers.update({
-    "User-Agent": "Mozilla/5.0 (compatible; FetchPostBot/2.0; +https://example.com/bot)"
-})
-
-# translator
-translator = Translator()
+# HTTP session and translator are built on first use (get_session / get_translator)
+_session = None
+_translator = None
 
 # scraping sources (English + Hindi)
 DOMESTIC_SOURCES = [
@@ -76,20 +65,8 @@ INTERNATIONAL_SOURCES = [
 # scraping constraints
 MIN_LEN = 25
 MAX_LEN = 400
-
-# keywords and weights for scoring
-KEYWORDS = [
-    "bjp", "congress", "rahul", "modi", "india", "election", "violence",
-    "lynching", "corruption", "protest", "china", "pakistan", "usa",
-    "cricket", "sports", "discrimination", "reservation", "scandal",
-    "police", "govt", "government", "cabinet", "mla", "mp"
-]
-
-TOPIC_WEIGHTS = {
-    "BJP": 3, "Congress": 3, "corruption": 3, "lynching": 3,
-    "cricket": 2, "sports": 1, "china": 2, "pakistan": 2,
-    "usa": 2, "election": 3, "violence": 2, "discrimination": 2
-}
+TRANSLATE_TIMEOUT = 20   # googletrans has no timeout of its own
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "1"))   # concurrent page downloads; parse_pool needs > 1
 
 # prefixes / emojis in Hindi-tone
 PREFIXES = [
@@ -123,19 +100,29 @@ KEYWORD_IMPACT_MAP = {
 }
 
 # ------------------------ State (persisted) ------------------------
-if os.path.exists(POSTED_FILE):
-    try:
-        with open(POSTED_FILE, "r", encoding="utf-8") as f:
-            posted_state = json.load(f)
-    except Exception:
-        posted_state = {"prefix":{}, "emoji":{}, "IR_count":0, "last_text":""}
-else:
-    posted_state = {"prefix":{}, "emoji":{}, "IR_count":0, "last_text":""}
+posted_state = state_store.StateFile(POSTED_FILE, ("prefix", "emoji", "IR", "title"))
+
+# ------------------------ Lazy clients ------------------------
+def get_session():
+    """HTTP session with retries, built on first use so early-exit runs never import requests."""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter, Retry
+        _session = requests.Session()
+        retries = Retry(total=2, backoff_factor=0.8, status_forcelist=[429,500,502,503,504])
+        _session.mount("https://", HTTPAdapter(max_retries=retries))
+        _session.headers.update({
+            "User-Agent": "Mozilla/5.0 (compatible; FetchPostBot/2.0; +https://example.com/bot)"
+        })
+    return _session
 
-# helper to save posted_state
-def save_posted_state():
-    with open(POSTED_FILE, "w", encoding="utf-8") as f:
-        json.dump(posted_state, f, ensure_ascii=False, indent=2)
+def get_translator():
+    global _translator
+    if _translator is None:
+        from googletrans import Translator
+        _translator = Translator()
+    return _translator
 
 # ------------------------ Utilities ------------------------
 def sanitize(text):
@@ -146,14 +133,17 @@ def sanitize(text):
     t = re.sub(r'\s+', ' ', t).strip()
     return t
 
-def safe_get(url, timeout=10):
+@metrics.timed("fetch")
+def safe_get(url, timeout=None):
     try:
-        r = session.get(url, timeout=timeout)
-        r.raise_for_status()
-        return r.text
+        return http_fetch.fetch_text(url, session=get_session(), timeout=timeout)
+    except source_health.CircuitOpen as e:
+        print(f"[SKIP] {e}")   # counted as fetch_skipped_open by http_fetch; the source was never contacted
+        return None
     except Exception as e:
         # print minimal to avoid flooding logs
         print(f"[WARN] GET failed: {url} -> {e}")
+        metrics.count("fetch_failed")
         return None
 
 def try_text(tag):
@@ -162,25 +152,22 @@ def try_text(tag):
     except Exception:
         return ""
 
-def smart_truncate(text, max_chars=280):
-    if len(text) <= max_chars:
-        return text
-    # try to cut at punctuation close to end
-    cut = text[:max_chars-3]
-    idx = max(cut.rfind('.'), cut.rfind('।'), cut.rfind('!'), cut.rfind('?'), cut.rfind(';'))
-    if idx and idx > int(0.5 * len(cut)):
-        return text[:idx+1]
-    # else cut at last space
-    last_space = cut.rfind(' ')
-    if last_space > int(0.4 * len(cut)):
-        return cut[:last_space] + "..."
-    return cut + "..."
-
 # ------------------------ Scraping & extraction ------------------------
 def extract_page_items(url):
+    """Items of url, downloaded and parsed at most once per run; empty results are not memoized so retries refetch."""
+    items = fetch_memo.get(("page_items", url), lambda: _extract_page_items(url), cache_if=bool)
+    return [dict(h) for h in items]
+
+def _extract_page_items(url):
     html_text = safe_get(url)
     if not html_text:
         return []
+    return page_fingerprints.items_for("fetchpost2", url, html_text,
+                                      lambda text: parse_pool.run(parse_page_items, text, url))
+
+@metrics.timed("parse")
+def parse_page_items(html_text, url):
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html_text, "html.parser")
     items = []
 
@@ -236,44 +223,65 @@ def extract_page_items(url):
     seen = set()
     unique = []
     for it in items:
-        key = re.sub(r'\W+', ' ', it['title']).strip().lower()
+        key = tokenizer.dedupe_key(it['title'])
         if key in seen:
             continue
         seen.add(key)
         unique.append(it)
     return unique
 
-# small topic detector
+# small topic detector; whole tokens, so "mp" no longer fires on "company" or "usa" on "usage"
+TOPIC_KEYWORDS = [
+    ("Politics", {"bjp", "congress", "modi", "rahul", "election", "elections", "minister", "ministers",
+                  "government", "cabinet", "mla", "mlas", "mp", "mps", "party", "parties",
+                  "भाजपा", "कांग्रेस", "मोदी", "राहुल", "चुनाव", "मंत्री", "सरकार", "मंत्रिमंडल", "विधायक",
+                  "सांसद", "पार्टी", "दल"}),
+    ("International Relations", {"china", "pakistan", "usa", "russia", "international", "world", "global",
+                                 "चीन", "पाकिस्तान", "अमेरिका", "रूस", "अंतरराष्ट्रीय", "विश्व", "दुनिया"}),
+    ("Sports", {"cricket", "match", "matches", "ipl", "football", "sports", "hockey", "player", "players",
+                "क्रिकेट", "मैच", "आईपीएल", "फुटबॉल", "खेल", "हॉकी", "खिलाडी"}),
+]
+
 def detect_topic(title):
-    t = title.lower()
-    if any(k in t for k in ["bjp","congress","modi","rahul","election","minister","government","cabinet","mla","mp","party"]):
-        return "Politics"
-    if any(k in t for k in ["china","pakistan","usa","russia","international","world","global"]):
-        return "International Relations"
-    if any(k in t for k in ["cricket","match","ipl","football","sports","hockey","player"]):
-        return "Sports"
+    words = tokenizer.token_set(title)
+    for topic, keywords in TOPIC_KEYWORDS:
+        if words & keywords:
+            return topic
     return "General"
 
+def scrape_source(u):
+    if deadline.expired():
+        print(f"[DEADLINE] Run budget nearly used — not starting {u}.")
+        return []
+    if not source_health.allow(u):
+        print(f"[SKIP] {u}: circuit open after repeated failures")
+        metrics.count("fetch_skipped_open")
+        return []
+    tries = 0
+    while tries < 2:
+        tries += 1
+        try:
+            items = extract_page_items(u)
+            if items:
+                return items
+            else:
+                time.sleep(0.4)
+        except Exception as e:
+            print(f"[WARN] extract error {u}: {e}")
+            time.sleep(0.5)
+        if source_health.state(u) != source_health.CLOSED:
+            break  # failed probe or breaker just opened: a retry would only burn another timeout
+    return []
+
 def scrape_sources(urls, limit=120):
-    all_items = []
-    for u in urls:
-        tries = 0
-        while tries < 2:
-            tries += 1
-            try:
-                items = extract_page_items(u)
-                if items:
-                    all_items.extend(items)
-                    break
-                else:
-                    time.sleep(0.4)
-            except Exception as e:
-                print(f"[WARN] extract error {u}: {e}")
-                time.sleep(0.5)
+    # FETCH_WORKERS downloads at once; their pages are parsed in parse_pool's processes when it is enabled
+    parse_pool.start(len(urls), concurrency=FETCH_WORKERS)
+    with ThreadPoolExecutor(max_workers=max(1, FETCH_WORKERS)) as fetchers:
+        all_items = [h for items in fetchers.map(scrape_source, urls) for h in items]
     # dedupe across sources
     normalized = {}
     for h in all_items:
-        key = re.sub(r'\W+', ' ', h['title']).strip().lower()
+        key = tokenizer.dedupe_key(h['title'])
         if key in normalized:
             # keep one with subtitle if possible
             if not normalized[key].get("subtitle") and h.get("subtitle"):
@@ -284,22 +292,6 @@ def scrape_sources(urls, limit=120):
     return out[:limit]
 
 # ------------------------ Scoring ------------------------
-def assign_scores(headlines):
-    words = []
-    for h in headlines:
-        words += re.findall(r'\w+', h['title'].lower())
-    freq = Counter(words)
-    for h in headlines:
-        score = 1
-        for w in re.findall(r'\w+', h['title'].lower()):
-            if w in KEYWORDS:
-                score += freq[w]
-        for k, v in TOPIC_WEIGHTS.items():
-            if k.lower() in h['title'].lower():
-                score += v
-        h['score'] = score
-    return headlines
-
 def save_headlines(headlines, filepath):
     top = sorted(headlines, key=lambda x: x.get('score',0), reverse=True)[:max(15, len(headlines)//3)]
     with open(filepath, "w", encoding="utf-8") as f:
@@ -317,21 +309,10 @@ def load_headlines(filepath):
         print(f"[WARN] load failed {filepath}: {e}")
         return []
 
-# ------------------------ Pick headline ------------------------
-def pick_headline_weighted(headlines):
-    weighted = [h for h in headlines if h.get('score',0) > 0]
-    if not weighted:
-        return None
-    weights = [h['score'] for h in weighted]
-    try:
-        return random.choices(weighted, weights=weights, k=1)[0]
-    except Exception:
-        return random.choice(weighted)
-
 # ------------------------ Reason & impact generation ------------------------
 def infer_reason_impact(headline_obj):
     # Try map based on keywords; otherwise generic
-    title = headline_obj.get('title','').lower()
+    title = tokenizer.token_set(headline_obj.get('title',''))
     reason = ""
     impact = ""
     for kw in KEYWORD_IMPACT_MAP:
@@ -392,38 +373,49 @@ def compose_final_tweet(headline_obj, force_target=None):
     eng = humanize_english(eng)
 
     # pick prefix and emoji with usage limits
-    prefix = random.choice([p for p in PREFIXES if posted_state["prefix"].get(p,0) < 3] or PREFIXES)
-    emoji = random.choice([e for e in EMOJIS if posted_state["emoji"].get(e,0) < 3] or EMOJIS)
-    posted_state["prefix"][prefix] = posted_state["prefix"].get(prefix,0) + 1
-    posted_state["emoji"][emoji] = posted_state["emoji"].get(emoji,0) + 1
+    prefix = random.choice([p for p in PREFIXES if posted_state.usage["prefix"].get(p) < 3] or PREFIXES)
+    emoji = random.choice([e for e in EMOJIS if posted_state.usage["emoji"].get(e) < 3] or EMOJIS)
+    posted_state.usage["prefix"].add(prefix)
+    posted_state.usage["emoji"].add(emoji)
 
     combined = f"{prefix} {emoji} {eng}"
-    # translate to Hindi (preferred)
-    try:
-        trans = translator.translate(combined, src='en', dest='hi').text
-        trans = sanitize(trans)
-    except Exception as e:
-        print(f"[WARN] translation failed: {e}")
+    # translate to Hindi (preferred); near the deadline post the source text instead
+    if deadline.expired():
+        print("[DEADLINE] Skipping translation, using source text.")
         trans = sanitize(combined)
-
-    # final safety: truncate <= 280 preserving sentences where possible
-    final = smart_truncate(trans, 280)
+    else:
+        try:
+            with metrics.timer("translate"):
+                trans = deadline.call(get_translator().translate, combined, src='en', dest='hi',
+                                      timeout=TRANSLATE_TIMEOUT).text
+            trans = sanitize(trans)
+        except Exception as e:
+            print(f"[WARN] translation failed: {e}")
+            trans = sanitize(combined)
+
+    # final safety: truncate to X's weighted 280 preserving sentences where possible
+    final = tweet_text.truncate(trans)
     return final, reason, impact
 
 # ------------------------ Posting (method unchanged) ------------------------
 def post_tweet(text):
     try:
-        client.create_tweet(text=text)
-        print(f"[{datetime.utcnow().isoformat()}] ✅ Tweet posted (len={len(text)}): {text[:140]}...")
+        tweet_id = outbox.send("fetchpost2", text, x_client.create_tweet)
+        print(f"[{datetime.utcnow().isoformat()}] ✅ Tweet posted (len={tweet_text.weighted_length(text)}, id={tweet_id}): {text[:140]}...")
     except Exception as e:
-        print(f"[{datetime.utcnow().isoformat()}] ❌ Failed to post tweet: {e}")
+        print(f"[{datetime.utcnow().isoformat()}] ❌ Failed to post tweet (kept in outbox for retry): {e}")
         traceback.print_exc()
 
 # ------------------------ Main workflow ------------------------
 def main():
     print(f"\n[START] fetchpost_ultimate run at {datetime.now().isoformat()}\n")
 
+    # 0) bail out before scraping if the shared X budget is used up, then retry earlier failures
+    if not outbox.preflight("fetchpost2"):
+        return
+
     # 1) Scrape
+    profiling.snapshot("before parse")
     print("[STEP] Scraping domestic sources...")
     domestic_items = scrape_sources(DOMESTIC_SOURCES, limit=160)
     print(f"[INFO] Domestic scraped: {len(domestic_items)} items")
@@ -431,10 +423,12 @@ def main():
     print("[STEP] Scraping international sources...")
     international_items = scrape_sources(INTERNATIONAL_SOURCES, limit=120)
     print(f"[INFO] International scraped: {len(international_items)} items")
+    parse_pool.shutdown()
+    profiling.snapshot("after parse")
 
     # 2) Score
-    domestic_scored = assign_scores(domestic_items)
-    international_scored = assign_scores(international_items)
+    domestic_scored = headline_scoring.assign_scores(domestic_items)
+    international_scored = headline_scoring.assign_scores(international_items)
 
     # 3) Save JSON (so poster can read same files)
     if domestic_scored:
@@ -454,30 +448,24 @@ def main():
         print("[ERROR] No headlines available — aborting.")
         return
 
-    # 5) choose headline, respect IR limit
-    tries = 0
-    chosen = None
-    while tries < 12:
-        tries += 1
-        candidate = pick_headline_weighted(all_headlines)
-        if not candidate:
-            continue
-        if candidate.get("topic") == "International Relations" and posted_state.get("IR_count",0) >= 3:
-            continue
-        chosen = candidate
-        break
-
+    # 5) choose headline, respect IR limit and skip already posted
+    sampler = headline_sampler.HeadlineSampler(all_headlines, ir_capped=posted_state.usage["IR"].get("count") >= 3,
+                                               posted=posted_state.usage["title"])
+    print(f"[INFO] {sampler.report()}")
+    chosen = sampler.draw()
     if not chosen:
-        chosen = random.choice(all_headlines)
-        print("[WARN] fallback chosen randomly")
+        print("[WARN] No eligible headline (IR cap reached / all already posted) — aborting.")
+        return
 
     # 6) compose
+    profiling.snapshot("before compose")
     final_text, reason, impact = compose_final_tweet(chosen)
-    print(f"[DEBUG] Composed tweet (len={len(final_text)}): {final_text[:200]}...")
+    profiling.snapshot("after compose")
+    print(f"[DEBUG] Composed tweet (len={tweet_text.weighted_length(final_text)}): {final_text[:200]}...")
 
     # 7) quality checks
     # avoid identical to last posted
-    last = posted_state.get("last_text","")
+    last = posted_state.get("last_text", "")
     if last and final_text.strip() == last.strip():
         print("[WARN] Final tweet identical to last posted — aborting to avoid duplicate.")
         return
@@ -491,14 +479,16 @@ def main():
     post_tweet(final_text)
 
     # 9) update posted state
-    posted_state["last_text"] = final_text
-    posted_state["last_posted_at"] = datetime.utcnow().isoformat()
+    posted_state.set("last_text", final_text)
+    posted_state.set("last_posted_at", datetime.utcnow().isoformat())
+    posted_state.usage["title"].add(chosen["title"].strip())
     if chosen.get("topic") == "International Relations":
-        posted_state["IR_count"] = posted_state.get("IR_count",0) + 1
+        posted_state.usage["IR"].add("count")
 
-    save_posted_state()
+    posted_state.save()
     print(f"[DONE] Run finished at {datetime.now().isoformat()}")
 
 # ------------------------ If run as script ------------------------
 if __name__ == "__main__":
-    main() 
+    with profiling.session("fetchpost2"), metrics.run("fetchpost2"), deadline.budget("fetchpost2"):
+        main() 
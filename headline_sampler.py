@@ -0,0 +1,55 @@
+import bisect
+import itertools
+import random
+from collections import Counter
+
+import tokenizer
+
+# ---------------- Settings ----------------
+IR_TOPIC = "International Relations"
+
+# ---------------- Constraint-aware weighted sampler ----------------
+class HeadlineSampler:
+    """Score-weighted draws over the headlines that pass the run's constraints.
+
+    Built once per run: ineligible items (IR cap reached, already posted,
+    duplicates by tokenizer.dedupe_key) are filtered up front and the weights are turned into prefix
+    sums, so each draw is a single bisect (O(log n)) and never has to be rejected.
+    """
+
+    def __init__(self, headlines, ir_capped=False, posted=None):
+        self.total = len(headlines)
+        self.skipped = Counter()
+        self.items = []
+        seen = set()
+        for h in headlines:
+            title = (h.get("title") or "").strip()
+            if not title:
+                self.skipped["no title"] += 1
+            elif tokenizer.dedupe_key(title) in seen:
+                self.skipped["duplicate"] += 1
+            elif posted is not None and posted.get(title):
+                self.skipped["already posted"] += 1
+            elif ir_capped and h.get("topic") == IR_TOPIC:
+                self.skipped["IR cap"] += 1
+            else:
+                seen.add(tokenizer.dedupe_key(title))
+                self.items.append(h)
+        weights = [max(h.get("score", 0) or 0, 0) for h in self.items]
+        if self.items and not any(weights):
+            weights = [1] * len(self.items)      # no scores at all: uniform over eligible items
+        self.cumulative = list(itertools.accumulate(weights))
+
+    def __len__(self):
+        return len(self.items)
+
+    def draw(self):
+        """One weighted pick, or None when nothing is eligible."""
+        if not self.items or not self.cumulative[-1]:
+            return None
+        r = random.random() * self.cumulative[-1]
+        return self.items[bisect.bisect_right(self.cumulative, r)]
+
+    def report(self):
+        skipped = ", ".join(f"{reason}: {n}" for reason, n in self.skipped.most_common())
+        return f"{len(self.items)}/{self.total} headlines eligible" + (f" (skipped {skipped})" if skipped else "")
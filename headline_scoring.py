@@ -0,0 +1,42 @@
+from collections import Counter
+
+import metrics
+import tokenizer
+
+# ---------------- Settings ----------------
+# exact tokens (tokenizer-normalized: no nukta, candrabindu as anusvara); a hit adds the word's
+# frequency across the batch, so stories several sources run score higher
+KEYWORDS = frozenset([
+    "bjp", "congress", "rahul", "modi", "india", "election", "violence",
+    "lynching", "corruption", "protest", "china", "pakistan", "usa",
+    "cricket", "sports", "discrimination", "reservation", "scandal",
+    "police", "govt", "government", "cabinet", "mla", "mp",
+    # Hindi sources
+    "भाजपा", "कांग्रेस", "राहुल", "मोदी", "भारत", "चुनाव", "हिंसा", "भ्रष्टाचार", "प्रदर्शन",
+    "चीन", "पाकिस्तान", "अमेरिका", "क्रिकेट", "खेल", "आरक्षण", "घोटाला", "पुलिस", "सरकार", "मंत्रिमंडल",
+    "विधायक", "सांसद",
+])
+
+# matched as token prefixes, like the old substring test but without hits inside other words:
+# "election" scores "elections", "BJP" scores "BJP-led", "usa" no longer scores "refusal"
+TOPIC_WEIGHTS = {
+    "BJP": 3, "Congress": 3, "corruption": 3, "lynching": 3,
+    "cricket": 2, "sports": 1, "China": 2, "Pakistan": 2,
+    "USA": 2, "election": 3, "violence": 2, "discrimination": 2,
+}
+
+_TOPIC_PREFIXES = [(tokenizer.normalize(k), v) for k, v in TOPIC_WEIGHTS.items()]
+
+# ---------------- Scoring ----------------
+def topic_score(words):
+    return sum(v for prefix, v in _TOPIC_PREFIXES if any(w.startswith(prefix) for w in words))
+
+@metrics.timed("score")
+def assign_scores(headlines):
+    """Set h['score'] = 1 + batch frequency of its keywords + its topic weights; returns headlines."""
+    freq = Counter(w for h in headlines for w in tokenizer.tokens(h['title']))
+    for h in headlines:
+        words = tokenizer.token_set(h['title'])
+        score = 1 + sum(freq[w] for w in tokenizer.tokens(h['title']) if w in KEYWORDS)
+        h['score'] = score + topic_score(words)
+    return headlines
@@ -0,0 +1,153 @@
+import os
+import re
+import time
+import codecs
+import resource
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import metrics
+import source_health
+import deadline
+
+# ---------------- Settings ----------------
+DEFAULT_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(768 * 1024)))  # decoded bytes kept per page
+# per-host caps for portals whose headline blocks sit further down (or that need less)
+SOURCE_MAX_BYTES = {
+    "www.bhaskar.com": 1024 * 1024,
+    "www.jagran.com": 1024 * 1024,
+}
+CHUNK_SIZE = 16 * 1024
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+_accept_encoding = None
+
+# ---------------- Helpers ----------------
+def accept_encoding():
+    """Advertise br only when a brotli decoder is installed (urllib3 decodes it transparently then)."""
+    global _accept_encoding
+    if _accept_encoding is None:
+        _accept_encoding = "gzip, deflate"
+        for module in ("brotli", "brotlicffi"):
+            try:
+                __import__(module)
+                _accept_encoding = "gzip, deflate, br"
+                break
+            except ImportError:
+                continue
+    return _accept_encoding
+
+def max_bytes_for(url):
+    return SOURCE_MAX_BYTES.get(urlparse(url).netloc, DEFAULT_MAX_BYTES)
+
+def _charset(content_type, head):
+    """Charset from the Content-Type header, else <meta charset>, else UTF-8 (never requests' ISO-8859-1 default)."""
+    m = re.search(r'charset=["\']?([\w-]+)', content_type or "", re.IGNORECASE)
+    if not m:
+        m = META_CHARSET_RE.search(head)
+        name = m.group(1).decode("ascii", "ignore") if m else "utf-8"
+    else:
+        name = m.group(1)
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return "utf-8"
+
+def _peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss   # KB on Linux
+
+def _log_download(url, r, received, capped, decode_seconds, peak_before):
+    wire = r.raw.tell() if hasattr(r.raw, "tell") else received
+    r.close()
+    metrics.count("bytes_wire", wire)
+    metrics.count("bytes_decoded", received)
+    metrics.observe("decode", decode_seconds)
+    print(f"📥 {urlparse(url).netloc}: {wire / 1024:.0f} KB on wire "
+          f"({r.headers.get('Content-Encoding', 'identity')}), {received / 1024:.0f} KB read"
+          f"{' (capped)' if capped else ''}, decode {decode_seconds * 1000:.1f} ms, "
+          f"peak RSS {_peak_rss_kb() / 1024:.0f} MB (+{(_peak_rss_kb() - peak_before) / 1024:.1f})")
+
+# ---------------- Streaming fetch ----------------
+@contextmanager
+def _download(url, session, headers, timeout):
+    """Streaming GET through the source's breaker; the outcome, body read included, goes to source_health.
+
+    Latency is time to headers, but success is only recorded once the body was read, so a
+    timeout or dropped connection mid-body counts as a failure of the source.
+    """
+    if not source_health.allow(url):
+        metrics.count("fetch_skipped_open")
+        raise source_health.CircuitOpen(f"circuit open, skipping {url}")
+    if session is None:
+        import requests as session
+    timeout = deadline.clamp(timeout or source_health.timeout_for(url))
+    request_headers = dict(headers or {})
+    request_headers["Accept-Encoding"] = accept_encoding()
+    started = time.perf_counter()
+    try:
+        r = session.get(url, headers=request_headers, timeout=timeout, stream=True)
+        r.raise_for_status()
+        latency = time.perf_counter() - started
+        yield r
+    except Exception as e:
+        source_health.record_failure(url, e)
+        raise
+    source_health.record_success(url, latency)
+
+def iter_text(url, session=None, headers=None, timeout=None, max_bytes=None):
+    """Yield decoded text chunks of url as they arrive, stopping once max_bytes (decoded) are read.
+
+    Raises on connection errors and HTTP error statuses, like requests' raise_for_status(), and
+    source_health.CircuitOpen without touching the network while the source's breaker is open.
+    The timeout defaults to one derived from the source's observed latency.
+    """
+    max_bytes = max_bytes or max_bytes_for(url)
+    peak_before = _peak_rss_kb()
+    with _download(url, session, headers, timeout) as r:
+        received, decode_seconds, capped = 0, 0.0, False
+        try:
+            decoder = None
+            for chunk in r.iter_content(CHUNK_SIZE):       # gzip/deflate/br already undone here
+                if not chunk:
+                    continue
+                if decoder is None:
+                    decoder = codecs.getincrementaldecoder(_charset(r.headers.get("Content-Type"), chunk[:4096]))("replace")
+                received += len(chunk)
+                started = time.perf_counter()
+                text = decoder.decode(chunk)
+                decode_seconds += time.perf_counter() - started
+                if text:
+                    yield text
+                if received >= max_bytes:
+                    capped = True
+                    break
+            if decoder is not None and not capped:   # a capped head may end mid-character; drop that
+                tail = decoder.decode(b"", final=True)
+                if tail:
+                    yield tail
+        finally:
+            _log_download(url, r, received, capped, decode_seconds, peak_before)
+
+def fetch_text(url, session=None, headers=None, timeout=None, max_bytes=None):
+    """Head of the page as one str (at most max_bytes decoded), streamed and decoded incrementally."""
+    return "".join(iter_text(url, session=session, headers=headers, timeout=timeout, max_bytes=max_bytes))
+
+def fetch_bytes(url, session=None, headers=None, timeout=None, max_bytes=None):
+    """Raw (content-decoded, not charset-decoded) body, uncapped unless max_bytes is given.
+
+    For feeds and other XML that declare their own encoding: the parser sees the
+    <?xml encoding?> declaration, and a cut-off document would not parse at all.
+    """
+    peak_before = _peak_rss_kb()
+    with _download(url, session, headers, timeout) as r:
+        chunks, received, capped = [], 0, False
+        try:
+            for chunk in r.iter_content(CHUNK_SIZE):
+                chunks.append(chunk)
+                received += len(chunk)
+                if max_bytes and received >= max_bytes:
+                    capped = True
+                    break
+        finally:
+            _log_download(url, r, received, capped, 0.0, peak_before)
+    return b"".join(chunks)
@@ -0,0 +1,186 @@
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+# ---------------- Files ----------------
+METRICS_FILE = "metrics.jsonl"                  # one JSON line per run
+PROM_DIR = os.getenv("METRICS_PROM_DIR")        # optional: write <script>.prom here (node_exporter textfile format)
+
+# ---------------- Settings ----------------
+WINDOW_RUNS = 50          # rolling window for p50/p95, per script
+MAX_LINES = 5000          # METRICS_FILE is trimmed to this many lines
+
+_lock = threading.Lock()
+_run = None
+
+# ---------------- Recording ----------------
+def _current():
+    global _run
+    if _run is None:
+        _run = {"script": os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0],
+                "started": time.time(), "stages": {}, "counters": {}}
+    return _run
+
+def observe(stage, seconds):
+    with _lock:
+        s = _current()["stages"].setdefault(stage, {"n": 0, "total": 0.0, "max": 0.0})
+        s["n"] += 1
+        s["total"] += seconds
+        s["max"] = max(s["max"], seconds)
+
+def count(name, n=1):
+    with _lock:
+        counters = _current()["counters"]
+        counters[name] = counters.get(name, 0) + n
+
+def stage_totals():
+    """stage -> seconds recorded so far in the current run."""
+    with _lock:
+        return {name: s["total"] for name, s in _current()["stages"].items()}
+
+@contextmanager
+def timer(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+def timed(stage):
+    """Decorator form of timer()."""
+    def wrap(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            with timer(stage):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+# ---------------- Run lifecycle ----------------
+@contextmanager
+def run(script):
+    """Scope one run: everything timed inside is written as a single METRICS_FILE line at the end."""
+    global _run
+    _run = {"script": script, "started": time.time(), "stages": {}, "counters": {}}
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        status = "error" if not isinstance(e, SystemExit) or e.code not in (None, 0) else "ok"
+        raise
+    finally:
+        finish(status)
+
+def finish(status="ok"):
+    global _run
+    with _lock:
+        current, _run = _current(), None
+    line = {
+        "script": current["script"],
+        "started": round(current["started"], 3),
+        "duration": round(time.time() - current["started"], 3),
+        "status": status,
+        "stages": {k: {"n": v["n"], "total": round(v["total"], 4), "max": round(v["max"], 4)}
+                   for k, v in current["stages"].items()},
+        "counters": current["counters"],
+    }
+    history = _append(line)
+    quantiles = rolling_quantiles(history, current["script"])
+    print_summary(line, quantiles)
+    if PROM_DIR:
+        write_prometheus(line, quantiles)
+    return line
+
+def load_history():
+    if not os.path.exists(METRICS_FILE):
+        return []
+    history = []
+    with open(METRICS_FILE, "r", encoding="utf-8") as f:
+        for raw in f:
+            try:
+                history.append(json.loads(raw))
+            except ValueError:
+                continue
+    return history
+
+def _append(line):
+    """Append the run line and return the recent history (trimmed to MAX_LINES on disk)."""
+    history = load_history() + [line]
+    if len(history) > MAX_LINES:
+        history = history[-MAX_LINES:]
+        tmp = METRICS_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(h, ensure_ascii=False) + "\n" for h in history)
+        os.replace(tmp, METRICS_FILE)
+    else:
+        with open(METRICS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    return history
+
+# ---------------- Aggregation ----------------
+def _quantile(values, q):
+    values = sorted(values)
+    idx = min(len(values) - 1, max(0, int(round(q * (len(values) - 1)))))
+    return values[idx]
+
+def rolling_quantiles(history, script, window=WINDOW_RUNS):
+    """stage -> {"p50", "p95", "runs"} over the per-run stage totals of the last `window` runs."""
+    runs = [h for h in history if h.get("script") == script][-window:]
+    per_stage = {}
+    for h in runs:
+        per_stage.setdefault("run", []).append(h.get("duration", 0))
+        for stage, s in h.get("stages", {}).items():
+            per_stage.setdefault(stage, []).append(s.get("total", 0))
+    return {stage: {"p50": round(_quantile(v, 0.5), 3), "p95": round(_quantile(v, 0.95), 3), "runs": len(v)}
+            for stage, v in per_stage.items()}
+
+# ---------------- Output ----------------
+def print_summary(line, quantiles):
+    parts = [f"{stage} {s['total']:.2f}s/{s['n']}" for stage, s in
+             sorted(line["stages"].items(), key=lambda kv: -kv[1]["total"])]
+    print(f"📊 {line['script']} {line['status']} in {line['duration']:.2f}s"
+          + (f" | {', '.join(parts)}" if parts else ""))
+    pages = line["counters"].get("page_unchanged", 0) + line["counters"].get("page_parsed", 0)
+    if pages:
+        unchanged = line["counters"].get("page_unchanged", 0)
+        print(f"   pages unchanged {unchanged}/{pages} ({unchanged / pages:.0%}), extraction skipped for those")
+    run_q = quantiles.get("run")
+    if run_q:
+        print(f"   rolling run time p50 {run_q['p50']}s, p95 {run_q['p95']}s over {run_q['runs']} run(s)")
+
+def write_prometheus(line, quantiles):
+    script = line["script"]
+    out = ["# TYPE newsbot_stage_seconds summary"]
+    for stage, q in sorted(quantiles.items()):
+        if stage == "run":
+            continue
+        out.append(f'newsbot_stage_seconds{{script="{script}",stage="{stage}",quantile="0.5"}} {q["p50"]}')
+        out.append(f'newsbot_stage_seconds{{script="{script}",stage="{stage}",quantile="0.95"}} {q["p95"]}')
+    for stage, s in sorted(line["stages"].items()):
+        out.append(f'newsbot_stage_seconds_sum{{script="{script}",stage="{stage}"}} {s["total"]}')
+        out.append(f'newsbot_stage_seconds_count{{script="{script}",stage="{stage}"}} {s["n"]}')
+    out.append("# TYPE newsbot_run_duration_seconds gauge")
+    out.append(f'newsbot_run_duration_seconds{{script="{script}",status="{line["status"]}"}} {line["duration"]}')
+    out.append("# TYPE newsbot_run_last_timestamp_seconds gauge")
+    out.append(f'newsbot_run_last_timestamp_seconds{{script="{script}"}} {line["started"]}')
+    if line["counters"]:
+        out.append("# TYPE newsbot_run_events gauge")
+        for name, n in sorted(line["counters"].items()):
+            out.append(f'newsbot_run_events{{script="{script}",event="{name}"}} {n}')
+    os.makedirs(PROM_DIR, exist_ok=True)
+    path = os.path.join(PROM_DIR, f"{script}.prom")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write("\n".join(out) + "\n")
+    os.replace(path + ".tmp", path)
+
+if __name__ == "__main__":
+    # python metrics.py [script ...]  -> rolling p50/p95 per stage from METRICS_FILE
+    history = load_history()
+    for script in sys.argv[1:] or sorted({h.get("script") for h in history}):
+        print(f"📊 {script} (last {WINDOW_RUNS} runs):")
+        for stage, q in sorted(rolling_quantiles(history, script).items(), key=lambda kv: -kv[1]["p95"]):
+            print(f"   {stage:<14} p50 {q['p50']:>8}s  p95 {q['p95']:>8}s  ({q['runs']} run(s))")
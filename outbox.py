@@ -0,0 +1,168 @@
+import os
+import sys
+import sqlite3
+import time
+
+import x_client
+
+# ---------------- Files ----------------
+OUTBOX_DB = "outbox.db"
+
+# ---------------- Settings ----------------
+EXPIRY_HOURS = int(os.getenv("OUTBOX_EXPIRY_HOURS", "12"))  # news goes stale; drop unsent posts after this
+MAX_ATTEMPTS = 5
+BACKOFF_MINUTES = 15       # first retry delay, doubled per failed attempt
+NO_RETRY_STATUS = {400, 401, 403}   # rejected by X (duplicate, too long, forbidden): retrying cannot help
+# ValueError from local pre-flight validation is treated the same way
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    source       TEXT NOT NULL,
+    text         TEXT NOT NULL,
+    reply_to     TEXT,
+    status       TEXT NOT NULL DEFAULT 'pending',
+    created      REAL NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    last_error   TEXT,
+    tweet_id     TEXT,
+    sent_at      REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, source, next_attempt);
+CREATE TABLE IF NOT EXISTS counters (
+    source TEXT NOT NULL,
+    name   TEXT NOT NULL,
+    n      INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (source, name)
+);
+"""
+
+# ---------------- Connection ----------------
+def connect(path=OUTBOX_DB):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def _count(conn, source, name, n=1):
+    conn.execute(
+        "INSERT INTO counters (source, name, n) VALUES (?, ?, ?) "
+        "ON CONFLICT(source, name) DO UPDATE SET n = n + excluded.n",
+        (source, name, n),
+    )
+
+# ---------------- Outbox Operations ----------------
+def enqueue(conn, source, text, reply_to=None):
+    now = time.time()
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO outbox (source, text, reply_to, created, next_attempt) VALUES (?, ?, ?, ?, ?)",
+            (source, text, str(reply_to) if reply_to else None, now, now),
+        )
+    return cur.lastrowid
+
+def mark_sent(conn, item, tweet_id):
+    with conn:
+        conn.execute("UPDATE outbox SET status = 'sent', tweet_id = ?, sent_at = ?, attempts = attempts + 1 WHERE id = ?",
+                     (str(tweet_id), time.time(), item["id"]))
+        _count(conn, item["source"], "sent")
+        if item["attempts"] > 0:
+            _count(conn, item["source"], "recovered")
+
+def mark_failed(conn, item, error):
+    attempts = item["attempts"] + 1
+    status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(error, ValueError) or status_code in NO_RETRY_STATUS or attempts >= MAX_ATTEMPTS:
+        status = "rejected"
+    else:
+        status = "pending"
+    next_attempt = time.time() + BACKOFF_MINUTES * 60 * (2 ** (attempts - 1))
+    with conn:
+        conn.execute("UPDATE outbox SET status = ?, attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                     (status, attempts, next_attempt, str(error)[:500], item["id"]))
+        _count(conn, item["source"], "failed")
+        if status == "rejected":
+            _count(conn, item["source"], "lost")
+    return status
+
+def expire(conn, source=None):
+    cutoff = time.time() - EXPIRY_HOURS * 3600
+    where = "status = 'pending' AND created < ?" + (" AND source = ?" if source else "")
+    args = (cutoff, source) if source else (cutoff,)
+    with conn:
+        for row in conn.execute(f"SELECT source, COUNT(*) AS n FROM outbox WHERE {where} GROUP BY source", args).fetchall():
+            _count(conn, row["source"], "lost", row["n"])
+        cur = conn.execute(f"UPDATE outbox SET status = 'expired' WHERE {where}", args)
+    return cur.rowcount
+
+def due(conn, source, limit=1):
+    rows = conn.execute(
+        "SELECT * FROM outbox WHERE status = 'pending' AND source = ? AND next_attempt <= ? ORDER BY next_attempt LIMIT ?",
+        (source, time.time(), limit),
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+def _attempt(conn, item, send_fn):
+    try:
+        tweet_id = send_fn(item["text"], item["reply_to"])
+    except Exception as e:
+        mark_failed(conn, item, e)
+        raise
+    mark_sent(conn, item, tweet_id)
+    return tweet_id
+
+def send(source, text, send_fn, reply_to=None):
+    """Write the post to the outbox, then send it with send_fn(text, reply_to) -> tweet id.
+
+    On failure the post stays in the outbox for retry_pending() and the error is re-raised;
+    a caller that may come back to the same text (a cached response) checks has_text() first.
+    """
+    conn = connect()
+    item_id = enqueue(conn, source, text, reply_to)
+    item = dict(conn.execute("SELECT * FROM outbox WHERE id = ?", (item_id,)).fetchone())
+    return _attempt(conn, item, send_fn)
+
+def has_text(source, text):
+    """True if source already handed this exact text to the outbox (sent, still pending or rejected)."""
+    row = connect().execute(
+        "SELECT 1 FROM outbox WHERE source = ? AND text = ? AND status != 'expired' LIMIT 1", (source, text)
+    ).fetchone()
+    return row is not None
+
+def preflight(source):
+    """Entry-point check: False if the X budget is used up, else retries source's due posts and returns True."""
+    if not x_client.has_budget():
+        print("⛔ No X API budget left, exiting before any upstream work.")
+        return False
+    retry_pending(source, x_client.create_tweet)
+    return True
+
+def retry_pending(source, send_fn, limit=1):
+    """Retry up to `limit` due posts from earlier failed runs; returns how many went out."""
+    conn = connect()
+    expired = expire(conn, source)
+    if expired:
+        print(f"🗑️ Outbox: {expired} unsent post(s) expired after {EXPIRY_HOURS}h.")
+    recovered = 0
+    for item in due(conn, source, limit):
+        try:
+            tweet_id = _attempt(conn, item, send_fn)
+            recovered += 1
+            print(f"♻️ Outbox: recovered post #{item['id']} (attempt {item['attempts'] + 1}), Tweet ID: {tweet_id}")
+        except Exception as e:
+            print(f"❌ Outbox: retry of post #{item['id']} failed: {e}")
+    return recovered
+
+# ---------------- Inspection ----------------
+def print_stats(conn):
+    print("📤 Outbox:")
+    for row in conn.execute("SELECT source, status, COUNT(*) AS n FROM outbox GROUP BY source, status ORDER BY source"):
+        print(f"   {row['source']:<18} {row['status']:<9} {row['n']}")
+    print("📈 Counters (recovered = upstream work saved by retries, lost = dropped after retries/expiry):")
+    for row in conn.execute("SELECT source, name, n FROM counters ORDER BY source, name"):
+        print(f"   {row['source']:<18} {row['name']:<9} {row['n']}")
+
+if __name__ == "__main__":
+    print_stats(connect(sys.argv[1] if len(sys.argv) > 1 else OUTBOX_DB))
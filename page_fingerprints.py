@@ -0,0 +1,72 @@
+import re
+import time
+import hashlib
+
+import state_store
+import metrics
+
+# ---------------- Files ----------------
+FINGERPRINT_FILE = "page_fingerprints.json"   # per-page fingerprint + the items last extracted from it
+
+# ---------------- Settings ----------------
+HEADING_TAGS = ("h1", "h2", "h3", "h4")
+FEED_TAGS = ("title", "description")
+MAX_REUSE_HOURS = 24      # re-extract at least this often, so parser changes reach unchanged pages
+KEEP_DAYS = 7             # entries not refreshed for this long are dropped
+
+_store = None
+
+# ---------------- Fingerprint ----------------
+def _region_re(tags, binary=False):
+    pattern = r"<(%s)\b[^>]*>.*?</\1\s*>" % "|".join(tags)
+    return re.compile(pattern.encode("ascii") if binary else pattern, re.IGNORECASE | re.DOTALL)
+
+def fingerprint(body, tags=HEADING_TAGS):
+    """Hash of the page's heading region (the tags the extractor reads), else of the whole body.
+
+    Hashing only the headings ignores what changes on every request anyway:
+    timestamps, ad slots, CSRF tokens, cache-busting query strings.
+    body may be text or raw bytes (feeds, which are parsed undecoded).
+    """
+    binary = isinstance(body, bytes)
+    region = (b"\n" if binary else "\n").join(m.group(0) for m in _region_re(tags, binary).finditer(body)) or body
+    return hashlib.blake2b(region if binary else region.encode("utf-8", "replace"), digest_size=16).hexdigest()
+
+# ---------------- Store ----------------
+def _all():
+    global _store
+    if _store is None:
+        _store = state_store.read_json(FINGERPRINT_FILE)
+    return _store
+
+def clear():
+    """Drop the cached fingerprints so the next call re-reads the file (another run may have updated it)."""
+    global _store
+    _store = None
+
+def _save(key, entry):
+    """Write this page's entry under the lock, dropping entries nobody refreshed for KEEP_DAYS."""
+    cutoff = time.time() - KEEP_DAYS * 86400
+    def merge(data):
+        data[key] = entry
+        for k in [k for k, e in data.items() if e.get("at", 0) < cutoff]:
+            del data[k]
+    state_store.update_json(FINGERPRINT_FILE, merge)
+
+def items_for(scope, url, text, parse, tags=HEADING_TAGS):
+    """parse(text), unless the page is unchanged since the last run; then that run's items.
+
+    text is whatever parse() takes (decoded HTML, or raw feed bytes). scope separates
+    extractors that read the same URL into different item shapes.
+    """
+    key = f"{scope} {url}"
+    digest = fingerprint(text, tags)
+    entry = _all().get(key)
+    if entry and entry["hash"] == digest and time.time() - entry["at"] < MAX_REUSE_HOURS * 3600:
+        metrics.count("page_unchanged")
+        return [dict(h) for h in entry["items"]]
+    metrics.count("page_parsed")
+    items = parse(text)
+    entry = _all()[key] = {"hash": digest, "at": int(time.time()), "items": items}
+    _save(key, entry)
+    return [dict(h) for h in items]
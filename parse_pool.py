@@ -0,0 +1,92 @@
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import metrics
+
+# ---------------- Settings ----------------
+# PARSE_WORKERS: 0 parses in-process (default), "auto" uses one worker per available core, N caps it at N.
+# The pool is also capped by the fetchers feeding it, so it only starts with FETCH_WORKERS > 1.
+PARSE_WORKERS = os.getenv("PARSE_WORKERS", "0").lower()
+MIN_PAGES = 4             # below this, worker start-up costs more than it saves
+
+_lock = threading.Lock()
+_pool = None
+_workers = 0
+
+# ---------------- Sizing ----------------
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))   # respects container CPU sets / taskset
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def worker_count(pages=None, concurrency=None):
+    """Workers for a batch of `pages` submitted by `concurrency` fetchers: one per available core,
+    capped by PARSE_WORKERS, the batch size and the fetchers (idle workers only cost memory).
+
+    0 (parse in-process) unless that leaves at least 2 workers, e.g. always with a single fetcher.
+    """
+    if PARSE_WORKERS in ("", "0", "off", "false"):
+        return 0
+    limit = available_cores() if PARSE_WORKERS == "auto" else int(PARSE_WORKERS)
+    limit = min(limit, available_cores())
+    if pages is not None:
+        if pages < MIN_PAGES:
+            return 0
+        limit = min(limit, pages)
+    if concurrency is not None:
+        limit = min(limit, concurrency)
+    return limit if limit > 1 else 0
+
+# ---------------- Pool ----------------
+def start(pages, concurrency=None):
+    """Size the pool for a batch (grows it if a bigger batch needs more workers); returns the worker count, 0 in-process."""
+    global _pool, _workers
+    wanted = worker_count(pages, concurrency)
+    with _lock:
+        if wanted <= _workers:
+            return _workers
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        # spawn, not fork: the fetcher threads may hold locks (requests, logging) a forked child would inherit
+        _pool = ProcessPoolExecutor(max_workers=wanted, mp_context=multiprocessing.get_context("spawn"))
+        _workers = wanted
+        print(f"🧵 Parsing in {wanted} worker process(es) ({available_cores()} core(s) available)")
+        return wanted
+
+def shutdown():
+    global _pool, _workers
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool, _workers = None, 0
+
+def _timed_call(fn, args):
+    started = time.perf_counter()
+    return fn(*args), time.perf_counter() - started
+
+def run(fn, *args, stage="parse"):
+    """fn(*args) in a worker process when the pool is running, else inline.
+
+    fn must be a module-level function returning plain data (item dicts, not soup objects), since
+    arguments and results are pickled. The caller waits for the result, so each fetcher has at most
+    one page in the pool and the pickled HTML in flight is bounded by the fetcher count.
+    """
+    with _lock:
+        pool = _pool
+    if pool is None:
+        return fn(*args)
+    try:
+        result, seconds = pool.submit(_timed_call, fn, args).result()
+    except BrokenProcessPool as e:
+        # a worker died (OOM kill, crash in a C extension): finish the run in-process
+        print(f"⚠️ Parse pool broke ({e}), parsing in-process from here.")
+        metrics.count("parse_pool_broken")
+        shutdown()
+        return fn(*args)
+    metrics.observe(stage, seconds)   # the worker's own metrics never reach this run
+    return result
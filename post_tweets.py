@@ -1,9 +1,15 @@
 import os
 import json
 import random
-import re
 from datetime import datetime
-import tweepy
+import outbox
+import x_client
+import tweet_text
+import state_store
+import headline_sampler
+import metrics
+import tokenizer
+import profiling
 
 # ------------------------ Paths ------------------------
 base_dir = os.path.join(os.getcwd(), "scraped_tweets")
@@ -12,26 +18,8 @@ evening_file = os.path.join(base_dir, "evening.json")
 ir_file = os.path.join(base_dir, "international.json")
 posted_today_file = "posted_today.json"
 
-# ------------------------ Twitter API v2 ------------------------
-BEARER_TOKEN = os.environ['BEARER_TOKEN']
-API_KEY = os.environ['API_KEY']
-API_SECRET = os.environ['API_SECRET']
-ACCESS_TOKEN = os.environ['ACCESS_TOKEN']
-ACCESS_SECRET = os.environ['ACCESS_SECRET']
-
-client = tweepy.Client(
-    consumer_key=API_KEY,
-    consumer_secret=API_SECRET,
-    access_token=ACCESS_TOKEN,
-    access_token_secret=ACCESS_SECRET
-)
-
-# ------------------------ Load posted_today ------------------------
-if os.path.exists(posted_today_file):
-    with open(posted_today_file,"r",encoding="utf-8") as f:
-        posted_today = json.load(f)
-else:
-    posted_today = {"prefix": {}, "emoji": {}, "IR_count":0}
+# ------------------------ posted_today state ------------------------
+state = state_store.StateFile(posted_today_file, ("prefix", "emoji", "IR", "title"))
 
 # ------------------------ Helpers ------------------------
 def load_headlines(file_path):
@@ -46,13 +34,6 @@ def load_headlines(file_path):
         print(f"[WARN {datetime.now()}] Failed to load {file_path}: {e}")
         return []
 
-def pick_headline_weighted(headlines):
-    """Randomly pick weighted headline based on score."""
-    weighted = [h for h in headlines if h.get('score',0)>0]
-    if weighted:
-        return random.choices(weighted, weights=[h['score'] for h in weighted], k=1)[0]
-    return None
-
 # ------------------------ Dummy placeholders ------------------------
 prefixes = ["Breaking", "Alert", "Update"]
 emojis = ["🚨","🔥","⚡"]
@@ -63,7 +44,7 @@ def get_reason_impact(headline_obj, chance=0.2):
     reason = headline_obj.get("reason")
     impact = headline_obj.get("impact")
     if not reason and not impact and random.random() <= chance:
-        words = re.findall(r'\w+', headline_obj['title'].lower())
+        words = tokenizer.tokens(headline_obj['title'])
         reason_kw = next((k for k in keyword_impact_map if k.lower() in words), None)
         if reason_kw:
             reason_templates = [f"due to {reason_kw}", f"following {reason_kw}", f"amid {reason_kw}"]
@@ -75,13 +56,13 @@ def get_reason_impact(headline_obj, chance=0.2):
     return reason, impact
 
 def advanced_rephrase_specific(headline, reason, impact, sub_headline=None):
-    available_prefixes = [p for p in prefixes if posted_today["prefix"].get(p,0)<2]
+    available_prefixes = [p for p in prefixes if state.usage["prefix"].get(p)<2]
     prefix = random.choice(available_prefixes) if available_prefixes else random.choice(prefixes)
-    posted_today["prefix"][prefix] = posted_today["prefix"].get(prefix,0)+1
+    state.usage["prefix"].add(prefix)
 
-    available_emojis = [e for e in emojis if posted_today["emoji"].get(e,0)<2]
+    available_emojis = [e for e in emojis if state.usage["emoji"].get(e)<2]
     emoji = random.choice(available_emojis) if available_emojis else random.choice(emojis)
-    posted_today["emoji"][emoji] = posted_today["emoji"].get(emoji,0)+1
+    state.usage["emoji"].add(emoji)
 
     words = headline.split()
     new_words = []
@@ -101,20 +82,21 @@ def advanced_rephrase_specific(headline, reason, impact, sub_headline=None):
     if impact:
         full_text += f", impacting {impact}"
 
-    if len(full_text)>275:
-        full_text = full_text[:272]+"..."
+    full_text = tweet_text.truncate(full_text)
     return full_text
 
 # ------------------------ Post Tweet ------------------------
 def post_tweet(text):
     try:
-        client.create_tweet(text=text)
+        outbox.send("post_tweets", text, x_client.create_tweet)
         print(f"[{datetime.now()}] ✅ Tweet posted successfully")
     except Exception as e:
-        print(f"[{datetime.now()}] ❌ Failed to post tweet: {e}")
+        print(f"[{datetime.now()}] ❌ Failed to post tweet (kept in outbox for retry): {e}")
 
 # ------------------------ Main ------------------------
 def main():
+    if not outbox.preflight("post_tweets"):
+        return
     morning = load_headlines(morning_file)
     evening = load_headlines(evening_file)
     international = load_headlines(ir_file)
@@ -126,39 +108,33 @@ def main():
         print(f"[ERROR {datetime.now()}] No headlines available at all. Exiting.")
         return
 
-    tweet_obj = None
-    tries = 0
-
-    while tries<10:
-        candidate = pick_headline_weighted(all_headlines)
-        if not candidate:
-            break
-        if candidate.get('topic')=="International Relations" and posted_today.get("IR_count",0)>=3:
-            tries+=1
-            continue
-        tweet_obj = candidate
-        break
-
+    sampler = headline_sampler.HeadlineSampler(all_headlines, ir_capped=state.usage["IR"].get("count") >= 3,
+                                               posted=state.usage["title"])
+    print(f"[DEBUG {datetime.now()}] {sampler.report()}")
+    tweet_obj = sampler.draw()
     if not tweet_obj:
-        print(f"[WARN {datetime.now()}] Weighted pick failed, using fallback headline")
-        tweet_obj = random.choice(all_headlines)
+        print(f"[WARN {datetime.now()}] No eligible headline (IR cap reached / all already posted). Exiting.")
+        return
 
     reason, impact = get_reason_impact(tweet_obj)
-    tweet_text = advanced_rephrase_specific(
+    profiling.snapshot("before compose")
+    text = advanced_rephrase_specific(
         tweet_obj['title'], 
         reason, 
         impact,
         sub_headline=tweet_obj.get("sub")
     )
-    print(f"[DEBUG {datetime.now()}] Selected headline: {tweet_text[:100]}...")
+    profiling.snapshot("after compose")
+    print(f"[DEBUG {datetime.now()}] Selected headline: {text[:100]}...")
 
-    post_tweet(tweet_text)
+    post_tweet(text)
 
+    state.usage["title"].add(tweet_obj['title'].strip())
     if tweet_obj.get('topic')=="International Relations":
-        posted_today["IR_count"] = posted_today.get("IR_count",0)+1
+        state.usage["IR"].add("count")
 
-    with open(posted_today_file,"w",encoding="utf-8") as f:
-        json.dump(posted_today,f,ensure_ascii=False, indent=2)
+    state.save()
 
 if __name__=="__main__":
-    main()
+    with profiling.session("post_tweets"), metrics.run("post_tweets"):
+        main()
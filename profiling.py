@@ -0,0 +1,109 @@
+import os
+import sys
+import io
+import pstats
+import cProfile
+import tracemalloc
+from datetime import datetime
+from contextlib import contextmanager
+
+# ---------------- Files ----------------
+PROFILE_DIR = "profiles"   # one run-stamped sub-directory per profiled run
+
+# ---------------- Settings ----------------
+# PROFILE=1 / cpu -> cProfile, mem -> tracemalloc snapshots, all -> both; or pass --profile[=mode] on the CLI
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+_snapshots = []
+
+# ---------------- Switch ----------------
+def _mode():
+    """Profiling mode from PROFILE or a --profile[=mode] argument (removed from sys.argv)."""
+    mode = os.getenv("PROFILE", "").lower()
+    for arg in list(sys.argv[1:]):
+        if arg == "--profile" or arg.startswith("--profile="):
+            sys.argv.remove(arg)
+            mode = arg.partition("=")[2].lower() or "cpu"
+    if mode in ("", "0", "false", "off"):
+        return None
+    return {"1": "cpu", "true": "cpu", "on": "cpu"}.get(mode, mode)
+
+# ---------------- Snapshots ----------------
+def snapshot(label):
+    """Record a tracemalloc snapshot; no-op unless this run is memory-profiled."""
+    if tracemalloc.is_tracing():
+        _snapshots.append((label, tracemalloc.take_snapshot()))
+
+def _write_memory_reports(run_dir):
+    previous = None
+    for i, (label, snap) in enumerate(_snapshots):
+        path = os.path.join(run_dir, f"mem_{i:02d}_{label.replace(' ', '_')}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# top {TOP_ALLOCATIONS} allocations at '{label}'\n")
+            for stat in snap.statistics("lineno")[:TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+            if previous is not None:
+                f.write(f"\n# growth since '{previous[0]}'\n")
+                for stat in snap.compare_to(previous[1], "lineno")[:TOP_ALLOCATIONS]:
+                    f.write(f"{stat}\n")
+        previous = (label, snap)
+    _snapshots.clear()
+
+# ---------------- Run wrapper ----------------
+@contextmanager
+def session(script):
+    """Profile the enclosed run when switched on; reports go to PROFILE_DIR/<script>-<timestamp>/."""
+    mode = _mode()
+    if not mode:
+        yield
+        return
+    run_dir = os.path.join(PROFILE_DIR, f"{script}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+    os.makedirs(run_dir, exist_ok=True)
+    profiler = cProfile.Profile() if mode in ("cpu", "all") else None
+    if mode in ("mem", "all"):
+        tracemalloc.start()
+        snapshot("start")
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(run_dir, "profile.prof"))
+            with open(os.path.join(run_dir, "top_functions.txt"), "w", encoding="utf-8") as f:
+                pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        if tracemalloc.is_tracing():
+            snapshot("end")
+            current, peak = tracemalloc.get_traced_memory()
+            _write_memory_reports(run_dir)
+            tracemalloc.stop()
+            print(f"🧠 Memory: {current / 1e6:.1f} MB at end, peak {peak / 1e6:.1f} MB")
+        print(f"🔬 Profile ({mode}) written to {run_dir}")
+
+# ---------------- Profile diff ----------------
+def _cumulative(path):
+    stats = pstats.Stats(path, stream=io.StringIO())
+    return {f"{os.path.basename(fn)}:{line}({name})": (row[1], row[3])   # (calls, cumulative seconds)
+            for (fn, line, name), row in stats.stats.items()}
+
+def diff(base_path, other_path, limit=TOP_FUNCTIONS):
+    """Functions whose cumulative time changed most between two .prof files (e.g. normal vs slow run)."""
+    base, other = _cumulative(base_path), _cumulative(other_path)
+    rows = []
+    for key in set(base) | set(other):
+        b_calls, b_cum = base.get(key, (0, 0.0))
+        o_calls, o_cum = other.get(key, (0, 0.0))
+        rows.append((o_cum - b_cum, b_cum, o_cum, b_calls, o_calls, key))
+    rows.sort(key=lambda r: -abs(r[0]))
+    print(f"{'delta s':>9} {'base s':>9} {'other s':>9} {'calls':>13}  function")
+    for delta, b_cum, o_cum, b_calls, o_calls, key in rows[:limit]:
+        print(f"{delta:+9.3f} {b_cum:9.3f} {o_cum:9.3f} {b_calls:>6}/{o_calls:<6}  {key}")
+    return rows
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "diff":
+        diff(sys.argv[2], sys.argv[3])
+    else:
+        print("Usage: python profiling.py diff <normal.prof> <slow.prof>")
@@ -0,0 +1,164 @@
+import os
+import sys
+import json
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+# ---------------- Files ----------------
+REPLY_QUEUE_DB = "reply_queue.db"
+LEGACY_QUEUE_FILE = "reply_queue.json"
+
+# ---------------- Settings ----------------
+MAX_AGE_HOURS = int(os.getenv("REPLY_QUEUE_MAX_AGE_HOURS", "24"))  # freshness horizon for eviction
+CLAIM_TIMEOUT = 30 * 60   # seconds before an un-acked claim (crashed run) is handed out again
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue (
+    seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+    profile    TEXT NOT NULL,
+    tweet_id   TEXT NOT NULL UNIQUE,
+    text       TEXT NOT NULL,
+    added      TEXT NOT NULL,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    claimed_at REAL,
+    draft      TEXT,
+    draft_at   TEXT,
+    posted_at  TEXT,
+    fresh_at   TEXT
+);
+"""
+
+# ---------------- Connection ----------------
+def connect(path=REPLY_QUEUE_DB):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    _add_missing_columns(conn)
+    _migrate_legacy(conn)
+    return conn
+
+def _add_missing_columns(conn):
+    columns = {r["name"] for r in conn.execute("PRAGMA table_info(queue)")}
+    with conn:
+        for name in ("draft", "draft_at", "posted_at", "fresh_at"):
+            if name not in columns:
+                conn.execute(f"ALTER TABLE queue ADD COLUMN {name} TEXT")
+        conn.execute("UPDATE queue SET fresh_at = COALESCE(posted_at, added) WHERE fresh_at IS NULL")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_queue_fresh ON queue(fresh_at)")
+
+def _migrate_legacy(conn, legacy_path=LEGACY_QUEUE_FILE):
+    """Import the old reply_queue.json dict-of-lists once, then move it aside."""
+    if not os.path.exists(legacy_path):
+        return
+    try:
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+    except Exception:
+        legacy = {}
+    with conn:
+        for profile, items in legacy.items():
+            for item in items:
+                if item.get("id"):
+                    _insert(conn, profile, item["id"], item.get("text", ""), item.get("added"))
+    os.replace(legacy_path, legacy_path + ".migrated")
+    print(f"📦 Migrated {legacy_path} into {REPLY_QUEUE_DB}")
+
+def _insert(conn, profile, tweet_id, text, added=None, posted_at=None):
+    added = added or datetime.utcnow().isoformat()
+    cur = conn.execute(
+        "INSERT OR IGNORE INTO queue (profile, tweet_id, text, added, posted_at, fresh_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (profile, str(tweet_id), text, added, posted_at, posted_at or added),
+    )
+    return cur.rowcount == 1
+
+# ---------------- Queue Operations ----------------
+def enqueue(conn, profile, tweet_id, text, added=None, posted_at=None):
+    """Add a tweet to the queue; returns False if it was already queued.
+
+    posted_at (tweet time, naive UTC ISO) ranks the item; the queue time is used when unknown.
+    """
+    with conn:
+        return _insert(conn, profile, tweet_id, text, added, posted_at)
+
+def expire_stale(conn, max_age_hours=MAX_AGE_HOURS):
+    """Evict items older than the freshness horizon (and ones out of attempts)."""
+    cutoff = (datetime.utcnow() - timedelta(hours=max_age_hours)).isoformat()
+    with conn:
+        cur = conn.execute("DELETE FROM queue WHERE fresh_at < ? OR attempts >= ?", (cutoff, MAX_ATTEMPTS))
+    return cur.rowcount
+
+def claim_next(conn):
+    """Hand out the freshest unclaimed item; it stays queued until ack() or release()."""
+    now = time.time()
+    with conn:
+        row = conn.execute(
+            "SELECT * FROM queue WHERE claimed_at IS NULL OR claimed_at < ? ORDER BY fresh_at DESC LIMIT 1",
+            (now - CLAIM_TIMEOUT,),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE queue SET claimed_at = ?, attempts = attempts + 1 WHERE seq = ?", (now, row["seq"]))
+    return dict(row)
+
+def ack(conn, seq):
+    with conn:
+        conn.execute("DELETE FROM queue WHERE seq = ?", (seq,))
+
+def release(conn, seq):
+    with conn:
+        conn.execute("UPDATE queue SET claimed_at = NULL WHERE seq = ?", (seq,))
+
+# ---------------- Drafts ----------------
+def draft_is_fresh(item):
+    """A draft lives as long as its item: expire_stale() drops both once fresh_at is past the horizon."""
+    return bool(item.get("draft")) and bool(item.get("draft_at"))
+
+def items_needing_drafts(conn, ahead):
+    """Undrafted items among the next `ahead` ones claim_next() will hand out, in claim order."""
+    rows = conn.execute(
+        "SELECT * FROM (SELECT * FROM queue WHERE claimed_at IS NULL OR claimed_at < ? ORDER BY fresh_at DESC LIMIT ?) "
+        "WHERE draft IS NULL OR draft = '' ORDER BY fresh_at DESC",
+        (time.time() - CLAIM_TIMEOUT, ahead),
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+def set_draft(conn, seq, draft):
+    with conn:
+        conn.execute("UPDATE queue SET draft = ?, draft_at = ? WHERE seq = ?",
+                     (draft, datetime.utcnow().isoformat(), seq))
+
+def stats(conn):
+    row = conn.execute(
+        "SELECT COUNT(*) AS depth, MIN(fresh_at) AS oldest, MAX(fresh_at) AS newest, "
+        "SUM(claimed_at IS NOT NULL) AS claimed, SUM(draft IS NOT NULL AND draft != '') AS drafted FROM queue"
+    ).fetchone()
+    per_profile = conn.execute("SELECT profile, COUNT(*) AS n FROM queue GROUP BY profile ORDER BY n DESC").fetchall()
+    return {
+        "depth": row["depth"],
+        "claimed": row["claimed"] or 0,
+        "drafted": row["drafted"] or 0,
+        "oldest": row["oldest"],
+        "newest": row["newest"],
+        "per_profile": {r["profile"]: r["n"] for r in per_profile},
+    }
+
+def _age(iso):
+    if not iso:
+        return "-"
+    delta = datetime.utcnow() - datetime.fromisoformat(iso)
+    return f"{delta.total_seconds() / 3600:.1f}h"
+
+def print_stats(conn):
+    s = stats(conn)
+    print(f"📬 Reply queue depth: {s['depth']} ({s['claimed']} claimed, {s['drafted']} drafted)")
+    print(f"   oldest: {s['oldest'] or '-'} (age {_age(s['oldest'])}), newest: {s['newest'] or '-'} (age {_age(s['newest'])})")
+    for profile, n in s["per_profile"].items():
+        print(f"   {n:>3}  {profile}")
+
+# ---------------- Inspection ----------------
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else REPLY_QUEUE_DB
+    print_stats(connect(path))
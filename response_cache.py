@@ -0,0 +1,80 @@
+import os
+import time
+import hashlib
+
+import state_store
+
+# ---------------- Files ----------------
+RESPONSE_CACHE_FILE = "response_cache.json"
+
+# ---------------- Settings ----------------
+CACHE_TTL_MINUTES = int(os.getenv("RESPONSE_CACHE_TTL_MINUTES", "90"))
+
+EMPTY_STATS = {"api_calls": 0, "cache_hits": 0, "cache_rejected": 0, "api_duplicates": 0}
+
+# ---------------- Cache Helpers ----------------
+def _bucket(now):
+    return int(now // (CACHE_TTL_MINUTES * 60))
+
+def cache_key(prompt, now=None):
+    """Key a prompt by its text and the current TTL time bucket."""
+    now = time.time() if now is None else now
+    digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:16]
+    return f"{digest}:{_bucket(now)}"
+
+def load_cache(script, path=RESPONSE_CACHE_FILE):
+    """Entries are shared (keyed by prompt); stats are kept per script, e.g. "bot" / "bot6"."""
+    data = state_store.read_json(path)
+    stats = data.get("stats", {}).get(script)
+    return {"script": script, "entries": data.get("entries", {}),
+            "stats": {**EMPTY_STATS, **(stats if isinstance(stats, dict) else {})}}
+
+def save_cache(cache, path=RESPONSE_CACHE_FILE):
+    """Merge this run's entries and its script's stats into the file, keeping the other script's."""
+    current = str(_bucket(time.time()))
+    def merge(data):
+        entries = {**data.get("entries", {}), **cache["entries"]}
+        # keep only entries from the current bucket, older ones can never be hit again
+        data["entries"] = {k: v for k, v in entries.items() if k.split(":")[-1] == current}
+        data["stats"] = {s: v for s, v in data.get("stats", {}).items() if isinstance(v, dict)}
+        data["stats"][cache["script"]] = cache["stats"]
+    state_store.update_json(path, merge)
+
+def record(cache, stat, n=1):
+    cache["stats"][stat] = cache["stats"].get(stat, 0) + n
+
+def get_cached(cache, prompt, is_posted=None):
+    """Return a fresh, unused cached response for prompt, or None.
+
+    An entry is only marked used once its post went out, so a failed or skipped post can
+    reuse it; is_posted(text) lets the caller reject responses already posted or queued.
+    """
+    entry = cache["entries"].get(cache_key(prompt))
+    if not entry or entry.get("used"):
+        return None
+    if time.time() - entry.get("created", 0) > CACHE_TTL_MINUTES * 60:
+        return None
+    if is_posted and is_posted(entry["response"]):
+        record(cache, "cache_rejected")
+        return None
+    record(cache, "cache_hits")
+    return entry["response"]
+
+def store(cache, prompt, response, is_posted=None):
+    """Store a fresh API response; counts it as a duplicate if it repeats one already seen."""
+    record(cache, "api_calls")
+    key = cache_key(prompt)
+    previous = cache["entries"].get(key)
+    if (previous and previous.get("response") == response) or (is_posted and is_posted(response)):
+        record(cache, "api_duplicates")
+    cache["entries"][key] = {"response": response, "created": time.time(), "used": False}
+
+def mark_used(cache, prompt, response):
+    entry = cache["entries"].get(cache_key(prompt))
+    if entry and entry.get("response") == response:
+        entry["used"] = True
+
+def stats_line(cache):
+    s = cache["stats"]
+    return (f"📦 Response cache ({cache['script']}): {s['cache_hits']} hit(s), {s['cache_rejected']} rejected, "
+            f"{s['api_calls']} API call(s), {s['api_duplicates']} duplicate response(s)")
@@ -1,12 +1,17 @@
 import os
 import json
 import random
-import re
 from datetime import datetime
-from collections import Counter
-import feedparser
-import tweepy
-from googletrans import Translator
+import outbox
+import x_client
+import tweet_text
+import state_store
+import headline_sampler
+import metrics
+import headline_scoring
+import profiling
+import http_fetch
+import page_fingerprints
 
 # ------------------------ Paths ------------------------
 base_dir = os.path.join(os.getcwd(), "scraped_tweets")
@@ -14,26 +19,8 @@ os.makedirs(base_dir, exist_ok=True)
 rss_file = os.path.join(base_dir, "rss_headlines.json")
 posted_today_file = "posted_today.json"
 
-# ------------------------ Twitter API v2 ------------------------
-BEARER_TOKEN = os.environ.get('BEARER_TOKEN')
-API_KEY = os.environ.get('API_KEY')
-API_SECRET = os.environ.get('API_SECRET')
-ACCESS_TOKEN = os.environ.get('ACCESS_TOKEN')
-ACCESS_SECRET = os.environ.get('ACCESS_SECRET')
-
-client = tweepy.Client(
-    consumer_key=API_KEY,
-    consumer_secret=API_SECRET,
-    access_token=ACCESS_TOKEN,
-    access_token_secret=ACCESS_SECRET
-)
-
-# ------------------------ Load posted_today ------------------------
-if os.path.exists(posted_today_file):
-    with open(posted_today_file, "r", encoding="utf-8") as f:
-        posted_today = json.load(f)
-else:
-    posted_today = {"prefix": {}, "emoji": {}, "IR_count": 0}
+# ------------------------ posted_today state ------------------------
+state = state_store.StateFile(posted_today_file, ("prefix", "emoji", "IR", "title"))
 
 # ------------------------ Config ------------------------
 prefixes = [
@@ -41,19 +28,16 @@ prefixes = [
     "Must Read", "Urgent", "Scandal", "Truth", "Explosive", "सावधान", "ताज़ा"
 ]
 emojis = ["🚨","🔥","⚡","💥","⚠️","📰","💣"]
-keywords = [
-    "bjp", "congress", "rahul", "modi", "india", "election", "violence",
-    "lynching", "corruption", "protest", "china", "pakistan", "usa",
-    "cricket", "sports", "discrimination", "reservation", "scandal"
-]
-topic_weights = {
-    "BJP": 3, "Congress": 3, "corruption": 3, "lynching": 3,
-    "cricket": 2, "sports": 1, "China": 2, "Pakistan": 2,
-    "USA": 2, "election": 3, "violence": 2, "discrimination": 2
-}
 synonyms = {}  # optional replacements
 keyword_impact_map = {}  # optional impact mapping
-translator = Translator()
+_translator = None  # built on first use by get_translator()
+
+def get_translator():
+    global _translator
+    if _translator is None:
+        from googletrans import Translator
+        _translator = Translator()
+    return _translator
 
 # ------------------------ RSS Sources ------------------------
 domestic_rss = [
@@ -71,31 +55,32 @@ international_rss = [
 ]
 
 # ------------------------ Fetch & Process RSS ------------------------
+# what feedparser sends when it fetches a feed itself
+FEED_ACCEPT = ("application/atom+xml,application/rdf+xml,application/rss+xml,application/x-netcdf,"
+               "application/xml;q=0.9,text/xml;q=0.2,*/*;q=0.1")
+
+@metrics.timed("fetch")
 def fetch_rss_headlines(urls):
+    import feedparser
+    feed_headers = {"User-Agent": feedparser.USER_AGENT, "Accept": FEED_ACCEPT}
     headlines = []
     for url in urls:
-        feed = feedparser.parse(url)
-        for entry in feed.entries:
-            title = entry.get('title', '').strip()
-            description = entry.get('description', '').strip()
-            if title and 30 < len(title) < 200:
-                headlines.append({"title": title, "description": description, "url": entry.get("link", "")})
+        try:
+            body = http_fetch.fetch_bytes(url, headers=feed_headers)
+        except Exception as e:
+            print(f"❌ {url}: {e}")
+            continue
+        headlines += page_fingerprints.items_for("rsspost1", url, body, parse_feed, tags=page_fingerprints.FEED_TAGS)
     return headlines
 
-def assign_scores(headlines):
-    all_words = []
-    for h in headlines:
-        all_words += re.findall(r'\w+', h['title'].lower())
-    freq = Counter(all_words)
-    for h in headlines:
-        h_score = 1
-        for w in re.findall(r'\w+', h['title'].lower()):
-            if w in keywords:
-                h_score += freq[w]
-        for k, v in topic_weights.items():
-            if k.lower() in h['title'].lower():
-                h_score += v
-        h['score'] = h_score
+def parse_feed(body):
+    import feedparser
+    headlines = []
+    for entry in feedparser.parse(body).entries:
+        title = entry.get('title', '').strip()
+        description = entry.get('description', '').strip()
+        if title and 30 < len(title) < 200:
+            headlines.append({"title": title, "description": description, "url": entry.get("link", "")})
     return headlines
 
 def save_json(headlines, file_path):
@@ -115,12 +100,6 @@ def load_headlines(file_path):
         except json.JSONDecodeError:
             return []
 
-def pick_headline_weighted(headlines):
-    weighted = [h for h in headlines if h.get('score',0) > 0]
-    if weighted:
-        return random.choices(weighted, weights=[h['score'] for h in weighted], k=1)[0]
-    return None
-
 def get_reason_impact(headline_obj, chance=0.3):
     reason = headline_obj.get("reason")
     impact = headline_obj.get("impact")
@@ -130,13 +109,13 @@ def get_reason_impact(headline_obj, chance=0.3):
     return reason, impact
 
 def advanced_rephrase_specific(headline, description, reason, impact):
-    available_prefixes = [p for p in prefixes if posted_today["prefix"].get(p,0)<2]
+    available_prefixes = [p for p in prefixes if state.usage["prefix"].get(p)<2]
     prefix = random.choice(available_prefixes) if available_prefixes else random.choice(prefixes)
-    posted_today["prefix"][prefix] = posted_today["prefix"].get(prefix,0)+1
+    state.usage["prefix"].add(prefix)
 
-    available_emojis = [e for e in emojis if posted_today["emoji"].get(e,0)<2]
+    available_emojis = [e for e in emojis if state.usage["emoji"].get(e)<2]
     emoji = random.choice(available_emojis) if available_emojis else random.choice(emojis)
-    posted_today["emoji"][emoji] = posted_today["emoji"].get(emoji,0)+1
+    state.usage["emoji"].add(emoji)
 
     # Combine title + description
     new_title = headline
@@ -151,28 +130,32 @@ def advanced_rephrase_specific(headline, description, reason, impact):
         new_title += extra_text
 
     full_text = f"{prefix} {emoji} {new_title}"
-    if len(full_text) > 280:
-        full_text = full_text[:277] + "..."
+    full_text = tweet_text.truncate(full_text)
 
     # Translate to Hindi
     try:
-        full_text_hi = translator.translate(full_text, dest='hi').text
+        with metrics.timer("translate"):
+            full_text_hi = get_translator().translate(full_text, dest='hi').text
     except:
         full_text_hi = full_text
 
-    return full_text_hi
+    return tweet_text.truncate(full_text_hi)
 
 def post_tweet(text):
     try:
-        client.create_tweet(text=text)
+        outbox.send("rsspost1", text, x_client.create_tweet)
         print(f"[{datetime.now()}] ✅ Tweet posted successfully")
     except Exception as e:
-        print(f"[{datetime.now()}] ❌ Failed to post tweet: {e}")
+        print(f"[{datetime.now()}] ❌ Failed to post tweet (kept in outbox for retry): {e}")
 
 # ------------------------ Main ------------------------
 def main():
-    domestic_headlines = assign_scores(fetch_rss_headlines(domestic_rss))
-    international_headlines = assign_scores(fetch_rss_headlines(international_rss))
+    if not outbox.preflight("rsspost1"):
+        return
+    profiling.snapshot("before parse")
+    domestic_headlines = headline_scoring.assign_scores(fetch_rss_headlines(domestic_rss))
+    international_headlines = headline_scoring.assign_scores(fetch_rss_headlines(international_rss))
+    profiling.snapshot("after parse")
 
     all_headlines = domestic_headlines + international_headlines
     if all_headlines:
@@ -185,18 +168,24 @@ def main():
         print(f"[ERROR {datetime.now()}] No headlines available for tweeting. Exiting.")
         return
 
-    tweet_obj = pick_headline_weighted(loaded_headlines)
+    sampler = headline_sampler.HeadlineSampler(loaded_headlines, posted=state.usage["title"])
+    print(f"[DEBUG {datetime.now()}] {sampler.report()}")
+    tweet_obj = sampler.draw()
     if not tweet_obj:
-        tweet_obj = random.choice(loaded_headlines)
+        print(f"[WARN {datetime.now()}] No eligible headline (all already posted). Exiting.")
+        return
 
     reason, impact = get_reason_impact(tweet_obj)
-    tweet_text = advanced_rephrase_specific(tweet_obj['title'], tweet_obj.get('description',''), reason, impact)
-    print(f"[DEBUG {datetime.now()}] Selected tweet: {tweet_text[:100]}...")
+    profiling.snapshot("before compose")
+    text = advanced_rephrase_specific(tweet_obj['title'], tweet_obj.get('description',''), reason, impact)
+    profiling.snapshot("after compose")
+    print(f"[DEBUG {datetime.now()}] Selected tweet: {text[:100]}...")
 
-    post_tweet(tweet_text)
+    post_tweet(text)
 
-    with open(posted_today_file, "w", encoding="utf-8") as f:
-        json.dump(posted_today, f, ensure_ascii=False, indent=2)
+    state.usage["title"].add(tweet_obj['title'].strip())
+    state.save()
 
 if __name__ == "__main__":
-    main()
+    with profiling.session("rsspost1"), metrics.run("rsspost1"):
+        main()
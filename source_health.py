@@ -0,0 +1,137 @@
+import os
+import time
+import uuid
+from urllib.parse import urlparse
+
+import state_store
+import metrics
+
+# ---------------- Files ----------------
+HEALTH_FILE = "source_health.json"   # per-source latency + breaker state, shared by all scrapers
+
+# ---------------- Settings ----------------
+FAILURES_TO_OPEN = 3          # consecutive failures before a source is skipped
+OPEN_COOLDOWN_MINUTES = 60    # first wait before a half-open probe; doubles per failed probe
+MAX_COOLDOWN_HOURS = 24
+EWMA_ALPHA = 0.3
+LATENCY_SAMPLES = 20
+MIN_SAMPLES = 5               # below this the default timeout is used
+DEFAULT_TIMEOUT = 10
+MIN_TIMEOUT, MAX_TIMEOUT = 3, 15
+TIMEOUT_FACTOR = 2.0          # timeout = p95 latency x factor
+PROBE_TIMEOUT = 120           # a half-open probe not resolved by then (crashed run) is handed to the next caller
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+_health = None
+_owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"   # this process, as the holder of half-open probes
+
+class CircuitOpen(Exception):
+    """Raised instead of fetching a source whose breaker is open."""
+
+# ---------------- State ----------------
+def _key(url):
+    return urlparse(url).netloc + urlparse(url).path
+
+def _all():
+    global _health
+    if _health is None:
+        _health = state_store.read_json(HEALTH_FILE)
+    return _health
+
+def clear():
+    """Drop the cached health file so the next call re-reads it (another run may have updated it)."""
+    global _health
+    _health = None
+
+def _entry(url):
+    return _all().setdefault(_key(url), {"state": CLOSED, "failures": 0, "latencies": []})
+
+def _save(url):
+    """Write this source's entry under the lock, keeping entries other runs updated meanwhile."""
+    key, entry = _key(url), _entry(url)
+    def merge(data):
+        data[key] = entry
+    state_store.update_json(HEALTH_FILE, merge)
+
+# ---------------- Breaker ----------------
+def _cooling_down(entry, now):
+    return now - entry.get("opened_at", 0) < entry.get("cooldown", OPEN_COOLDOWN_MINUTES * 60)
+
+def allow(url):
+    """False while the source's breaker is open; after the cooldown one half-open probe is let through.
+
+    The probe is claimed under the health file's lock (state + owner written back), so of
+    overlapping runs only one gets it; the others keep skipping until the probe resolves.
+    """
+    entry = _entry(url)
+    if entry["state"] == CLOSED:
+        return True
+    if entry["state"] == OPEN and _cooling_down(entry, time.time()):
+        return False
+    key, granted = _key(url), False
+    def claim(data):
+        nonlocal granted
+        current = data.get(key, entry)
+        now = time.time()
+        if current["state"] == CLOSED:
+            granted = True                                  # another run's probe already recovered it
+        elif current["state"] == OPEN and not _cooling_down(current, now):
+            current.update({"state": HALF_OPEN, "probe_owner": _owner, "probe_at": int(now)})
+            granted = True
+        elif current["state"] == HALF_OPEN and (current.get("probe_owner") == _owner
+                                                or now - current.get("probe_at", 0) > PROBE_TIMEOUT):
+            current.update({"probe_owner": _owner, "probe_at": int(now)})
+            granted = True
+        data[key] = current
+    data = state_store.update_json(HEALTH_FILE, claim)
+    _all()[key] = data[key]
+    return granted
+
+def state(url):
+    return _entry(url)["state"]
+
+def timeout_for(url):
+    """Request timeout from this source's observed latency (p95 x TIMEOUT_FACTOR, clamped)."""
+    latencies = sorted(_entry(url)["latencies"])
+    if len(latencies) < MIN_SAMPLES:
+        return DEFAULT_TIMEOUT
+    p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+    return round(min(MAX_TIMEOUT, max(MIN_TIMEOUT, p95 * TIMEOUT_FACTOR)), 1)
+
+def record_success(url, seconds):
+    entry = _entry(url)
+    entry["ewma"] = round(seconds if "ewma" not in entry else EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * entry["ewma"], 3)
+    entry["latencies"] = (entry["latencies"] + [round(seconds, 3)])[-LATENCY_SAMPLES:]
+    if entry["state"] != CLOSED:
+        print(f"🟢 {_key(url)} recovered, breaker closed.")
+    entry.update({"state": CLOSED, "failures": 0, "last_ok": int(time.time())})
+    for field in ("cooldown", "probe_owner", "probe_at"):
+        entry.pop(field, None)
+    _save(url)
+
+def record_failure(url, error):
+    entry = _entry(url)
+    entry["failures"] += 1
+    entry["last_error"] = str(error)[:200]
+    if entry["state"] == HALF_OPEN:
+        entry["cooldown"] = min(entry.get("cooldown", OPEN_COOLDOWN_MINUTES * 60) * 2, MAX_COOLDOWN_HOURS * 3600)
+        entry.update({"state": OPEN, "opened_at": int(time.time())})
+    elif entry["failures"] >= FAILURES_TO_OPEN:
+        entry.update({"state": OPEN, "opened_at": int(time.time()), "cooldown": OPEN_COOLDOWN_MINUTES * 60})
+    entry.pop("probe_owner", None)
+    entry.pop("probe_at", None)
+    if entry["state"] == OPEN:
+        metrics.count("breaker_open")
+        print(f"🔴 {_key(url)} failing ({entry['failures']}x), skipped for {entry['cooldown'] // 60} min.")
+    _save(url)
+
+# ---------------- Inspection ----------------
+def print_health():
+    print("🩺 Source health:")
+    for key, entry in sorted(_all().items()):
+        print(f"   {entry['state']:<9} ewma {entry.get('ewma', '-'):>6}s  timeout {timeout_for('https://' + key):>5}s  "
+              f"failures {entry['failures']}  {key}")
+
+if __name__ == "__main__":
+    print_health()
@@ -0,0 +1,94 @@
+import os
+import json
+import fcntl
+from contextlib import contextmanager
+
+import window_counter
+
+# ---------------- File helpers ----------------
+@contextmanager
+def locked(path):
+    """Exclusive advisory lock on a sidecar `<path>.lock` (the data file itself is replaced on write)."""
+    with open(path + ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def read_json(path, default=None):
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            pass
+    return {} if default is None else default
+
+def write_json_atomic(path, data):
+    """temp file + fsync + rename, so readers see either the old or the new file, never half of one."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def update_json(path, fn):
+    """Locked read-modify-write: fn(data) mutates the current on-disk state, which is then written back."""
+    with locked(path):
+        data = read_json(path)
+        fn(data)
+        write_json_atomic(path, data)
+    return data
+
+# ---------------- Shared posting state ----------------
+class StateFile:
+    """posted_today-style state shared by overlapping runs.
+
+    Each name in `counters` (the posting scripts use prefix/emoji/IR/title) is a
+    WindowCounter of usage over the last 24 h in hourly ring buffers, under .usage.
+
+    Nothing is read until first use. save() re-reads the file under the lock,
+    replays this run's counter adds onto the fresh counters and only overwrites
+    the plain fields this run set, so concurrent runs merge instead of losing updates.
+    """
+
+    def __init__(self, path, counters=()):
+        self.path = path
+        self.counter_names = tuple(counters)
+        self._data = None
+        self._usage = None
+        self._changed = {}
+
+    def _load(self):
+        if self._data is None:
+            self._data = read_json(self.path)
+            self._usage = window_counter.load_all(self._data, self.counter_names)
+
+    @property
+    def usage(self):
+        self._load()
+        return self._usage
+
+    def get(self, key, default=None):
+        self._load()
+        return self._data.get(key, default)
+
+    def set(self, key, value):
+        self._load()
+        self._data[key] = value
+        self._changed[key] = value
+
+    def save(self):
+        if self._data is None:
+            return
+        def merge(data):
+            fresh = window_counter.load_all(data, self.counter_names)
+            for name, counter in self._usage.items():
+                counter.merge_into(fresh[name])
+            window_counter.store_all(data, fresh)
+            data.update(self._changed)
+        self._data = update_json(self.path, merge)
+        self._usage = window_counter.load_all(self._data, self.counter_names)
+        self._changed = {}
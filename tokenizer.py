@@ -0,0 +1,58 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# ---------------- Settings ----------------
+CACHE_SIZE = 8192        # distinct (text, stopwords) pairs memoized; headlines repeat across scoring/dedupe/topics
+
+# \w alone stops at Devanagari vowel signs, virama and nukta (Unicode marks, not word characters),
+# so "प्रधानमंत्री" came out as ['प', 'रध', 'नम', 'त', 'र']. The whole block is word material except
+# the danda, double danda and abbreviation sign, plus Devanagari Extended and the Vedic extensions.
+WORD_RE = re.compile(r"[\w\u0900-\u0963\u0966-\u096F\u0971-\u097F\uA8E0-\uA8FF\u1CD0-\u1CFF]+")
+
+# rendering-only or spelling-variant marks folded away so portals' spellings compare equal
+FOLD = str.maketrans({
+    "\u200c": None,      # zero-width non-joiner
+    "\u200d": None,      # zero-width joiner
+    "\u093c": None,      # nukta: ज़रूरी / जरूरी (precomposed क़ etc. are split by NFC first)
+    "\u0901": "\u0902",  # candrabindu -> anusvara: हँसी / हंसी
+})
+
+# negations (नहीं, न, मत) stay out: "X करेंगे" and "X नहीं करेंगे" are different stories
+HINDI_STOPWORDS = frozenset("""
+    का के की को में से पर ने है हैं था थे थी थीं हो होगा होगी होंगे रहा रहे रही और या भी ही तो
+    यह ये वह वे इस उस इन उन इसे उसे जो कि तक लिए साथ बाद पहले एक कर करने करते किया किए गया गए गई
+    कहा अब जब तब यहां वहां कुछ सभी
+""".translate(FOLD).split())
+
+# ---------------- Tokenizing ----------------
+def normalize(text):
+    """NFC, case-folded, with the FOLD marks removed/unified: the form all token comparisons use."""
+    return unicodedata.normalize("NFC", text or "").casefold().translate(FOLD)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def tokens(text, stopwords=False):
+    """Words of text in English and Devanagari, keeping matras, virama and conjuncts inside the word.
+
+    stopwords=True drops Hindi function words (का, के, में, ...). Memoized per string; returns a tuple.
+    """
+    words = WORD_RE.findall(normalize(text))
+    if stopwords:
+        words = [w for w in words if w not in HINDI_STOPWORDS]
+    return tuple(words)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def token_set(text):
+    """frozenset of tokens(text), for keyword membership tests."""
+    return frozenset(tokens(text))
+
+def dedupe_key(text):
+    """Key under which two spellings of the same headline collide (punctuation, case, nukta, Hindi stopwords)."""
+    return " ".join(tokens(text, stopwords=True))
+
+def cache_info():
+    return tokens.cache_info()
+
+def clear_cache():
+    tokens.cache_clear()
+    token_set.cache_clear()
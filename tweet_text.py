@@ -0,0 +1,121 @@
+import re
+import unicodedata
+
+# ---------------- X weighted-length config (twitter-text v3) ----------------
+MAX_WEIGHTED_LENGTH = 280
+SCALE = 100
+DEFAULT_WEIGHT = 200
+TRANSFORMED_URL_LENGTH = 23
+# code point ranges that count as 1; everything else (CJK, emoji, ...) counts as 2
+LIGHT_RANGES = ((0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037))
+
+URL_RE = re.compile(r'https?://\S+', re.IGNORECASE)
+SENTENCE_ENDS = ("।", "॥", ".", "!", "?")
+ELLIPSIS = "..."
+
+# Indic viramas (halant): a consonant after one belongs to the same conjunct
+VIRAMAS = {"\u094d", "\u09cd", "\u0a4d", "\u0acd", "\u0b4d", "\u0bcd", "\u0c4d", "\u0ccd", "\u0d4d"}
+ZWJ, ZWNJ = "\u200d", "\u200c"
+
+# ---------------- Code point helpers ----------------
+def _weight(cp):
+    for lo, hi in LIGHT_RANGES:
+        if lo <= cp <= hi:
+            return 100
+    return DEFAULT_WEIGHT
+
+def _is_extender(ch):
+    cp = ord(ch)
+    return (unicodedata.category(ch) in ("Mn", "Mc", "Me")
+            or ch in (ZWJ, ZWNJ)
+            or 0xFE00 <= cp <= 0xFE0F          # variation selectors
+            or 0x1F3FB <= cp <= 0x1F3FF        # skin tone modifiers
+            or 0xE0020 <= cp <= 0xE007F)       # emoji tag sequences
+
+def _is_emoji(cluster):
+    for ch in cluster:
+        cp = ord(ch)
+        if 0x1F000 <= cp <= 0x1FAFF or 0x2600 <= cp <= 0x27BF or 0x2B00 <= cp <= 0x2BFF or cp == 0xFE0F:
+            return True
+    return False
+
+def graphemes(text):
+    """Split text into user-perceived characters.
+
+    Keeps matras, nukta and anusvara on their consonant, joins virama conjuncts
+    (क्ष) and emoji ZWJ/modifier sequences, so a cut never lands inside one.
+    """
+    clusters = []
+    for ch in text:
+        prev = clusters[-1][-1] if clusters else ""
+        if clusters and (_is_extender(ch) or prev == ZWJ or (prev in VIRAMAS and ch.isalpha())):
+            clusters[-1] += ch
+        elif (clusters and 0x1F1E6 <= ord(ch) <= 0x1F1FF and len(clusters[-1]) == 1
+              and 0x1F1E6 <= ord(clusters[-1]) <= 0x1F1FF):
+            clusters[-1] += ch                 # regional indicator pair (flag)
+        else:
+            clusters.append(ch)
+    return clusters
+
+def _cluster_weight(cluster):
+    if _is_emoji(cluster):
+        return DEFAULT_WEIGHT
+    return sum(_weight(ord(ch)) for ch in cluster)
+
+def _units(text):
+    """(piece, weight) pairs: one per grapheme, with each URL kept whole at 23."""
+    units = []
+    pos = 0
+    for m in URL_RE.finditer(text):
+        units += [(c, _cluster_weight(c)) for c in graphemes(text[pos:m.start()])]
+        units.append((m.group(0), TRANSFORMED_URL_LENGTH * SCALE))
+        pos = m.end()
+    units += [(c, _cluster_weight(c)) for c in graphemes(text[pos:])]
+    return units
+
+# ---------------- Public API ----------------
+def weighted_length(text):
+    """Length of text as X counts it (NFC, URLs as 23, emoji as 2, CJK etc. as 2)."""
+    if not text:
+        return 0
+    text = unicodedata.normalize("NFC", text)
+    return sum(w for _, w in _units(text)) // SCALE
+
+def is_valid(text, limit=MAX_WEIGHTED_LENGTH):
+    return bool(text and text.strip()) and weighted_length(text) <= limit
+
+def validate(text, limit=MAX_WEIGHTED_LENGTH):
+    """Raise ValueError if text cannot be posted as-is."""
+    if not text or not text.strip():
+        raise ValueError("tweet text is empty")
+    length = weighted_length(text)
+    if length > limit:
+        raise ValueError(f"tweet text too long: weighted length {length} > {limit}")
+
+def truncate(text, limit=MAX_WEIGHTED_LENGTH, min_ratio=0.5):
+    """Shorten text to fit limit, cutting on grapheme boundaries.
+
+    Prefers the last sentence end (।, ., !, ?) past min_ratio of the budget, then the
+    last space (with an ellipsis), then a hard cut (with an ellipsis).
+    """
+    text = unicodedata.normalize("NFC", text or "").strip()
+    if weighted_length(text) <= limit:
+        return text
+    units = _units(text)
+    budget = (limit - len(ELLIPSIS)) * SCALE
+    used = 0
+    cut = 0
+    for i, (_, w) in enumerate(units):
+        used += w
+        if used > budget:
+            break
+        cut = i + 1
+    head = [u for u, _ in units[:cut]]
+    floor = int(cut * min_ratio)
+    for i in range(cut - 1, floor - 1, -1):
+        if head[i] in SENTENCE_ENDS:
+            return "".join(head[:i + 1]).strip()
+    for i in range(cut - 1, floor - 1, -1):
+        if head[i] == " ":
+            return "".join(head[:i]).rstrip() + ELLIPSIS
+    return "".join(head).rstrip() + ELLIPSIS
@@ -0,0 +1,88 @@
+import time
+
+# ---------------- Settings ----------------
+WINDOW_BUCKETS = 24        # 24 x 1h buckets -> limits mean "in the last 24 h"
+BUCKET_SECONDS = 3600
+
+# ---------------- Sliding-window counter ----------------
+class WindowCounter:
+    """Per-key usage counts over a sliding window of time buckets.
+
+    Each key owns a fixed ring of WINDOW_BUCKETS slots plus a running total, so
+    get() is O(1) and memory is bounded; keys whose window empties are dropped.
+    """
+
+    def __init__(self, buckets=WINDOW_BUCKETS, bucket_seconds=BUCKET_SECONDS):
+        self.buckets = buckets
+        self.bucket_seconds = bucket_seconds
+        self.head = int(time.time() // bucket_seconds)
+        self.rings = {}
+        self.totals = {}
+        self.pending = []      # (key, n, bucket) added this run, replayed by merge_into()
+
+    def _advance(self, now=None):
+        bucket = int((time.time() if now is None else now) // self.bucket_seconds)
+        steps = bucket - self.head
+        if steps <= 0:
+            return
+        if steps >= self.buckets:
+            self.rings.clear()
+            self.totals.clear()
+        else:
+            for key, ring in list(self.rings.items()):
+                for b in range(self.head + 1, bucket + 1):
+                    slot = b % self.buckets
+                    self.totals[key] -= ring[slot]
+                    ring[slot] = 0
+                if self.totals[key] <= 0:
+                    del self.rings[key]
+                    del self.totals[key]
+        self.head = bucket
+
+    def add(self, key, n=1, now=None):
+        self._advance(now)
+        bucket = self.head if now is None else int(now // self.bucket_seconds)
+        if self.head - bucket >= self.buckets:
+            return
+        ring = self.rings.setdefault(key, [0] * self.buckets)
+        ring[bucket % self.buckets] += n
+        self.totals[key] = self.totals.get(key, 0) + n
+        self.pending.append((key, n, bucket))
+
+    def merge_into(self, other):
+        """Replay this run's adds onto `other` (e.g. a fresher copy read from disk)."""
+        for key, n, bucket in self.pending:
+            other.add(key, n, now=bucket * other.bucket_seconds)
+        return other
+
+    def get(self, key, now=None):
+        self._advance(now)
+        return self.totals.get(key, 0)
+
+    def to_dict(self):
+        self._advance()
+        return {"head": self.head, "bucket_seconds": self.bucket_seconds, "counts": self.rings}
+
+    @classmethod
+    def from_dict(cls, data, buckets=WINDOW_BUCKETS):
+        counter = cls(buckets, data.get("bucket_seconds", BUCKET_SECONDS))
+        counter.head = data.get("head", counter.head)
+        for key, ring in (data.get("counts") or {}).items():
+            if len(ring) == buckets:
+                counter.rings[key] = list(ring)
+                counter.totals[key] = sum(ring)
+        counter._advance()
+        return counter
+
+# ---------------- State-file helpers ----------------
+def load_all(state, names):
+    """WindowCounters for `names` from state["usage"]; old never-reset counters are dropped."""
+    usage = state.get("usage") or {}
+    for legacy in ("prefix", "emoji", "IR_count"):
+        state.pop(legacy, None)
+    return {name: WindowCounter.from_dict(usage.get(name) or {}) for name in names}
+
+def store_all(state, counters):
+    usage = state.get("usage") or {}
+    usage.update({name: c.to_dict() for name, c in counters.items()})
+    state["usage"] = usage
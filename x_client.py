@@ -0,0 +1,95 @@
+import os
+import time
+
+import tweet_text
+import state_store
+import metrics
+
+# ---------------- Files ----------------
+RATE_LIMIT_FILE = "x_rate_limit.json"   # shared by every posting script on this account
+
+# ---------------- Settings ----------------
+MIN_REMAINING = int(os.getenv("X_MIN_REMAINING", "1"))
+
+# header prefix -> window name in RATE_LIMIT_FILE
+RATE_LIMIT_HEADERS = {
+    "x-rate-limit": "app_15min",
+    "x-user-limit-24hour": "user_24hour",
+    "x-app-limit-24hour": "app_24hour",
+}
+
+_client = None
+
+# ---------------- Client ----------------
+def get_client():
+    """tweepy client built on first use; returns raw responses so rate-limit headers are visible."""
+    global _client
+    if _client is None:
+        import requests
+        import tweepy
+        _client = tweepy.Client(
+            consumer_key=os.environ.get("API_KEY"),
+            consumer_secret=os.environ.get("API_SECRET"),
+            access_token=os.environ.get("ACCESS_TOKEN"),
+            access_token_secret=os.environ.get("ACCESS_SECRET"),
+            return_type=requests.Response,
+        )
+    return _client
+
+# ---------------- Rate-limit State ----------------
+def load_state():
+    return state_store.read_json(RATE_LIMIT_FILE)
+
+def record_headers(headers):
+    """Store limit/remaining/reset from an X API response in the shared state file."""
+    if not headers:
+        return
+    windows = {}
+    for prefix, window in RATE_LIMIT_HEADERS.items():
+        remaining = headers.get(f"{prefix}-remaining")
+        reset = headers.get(f"{prefix}-reset")
+        if remaining is None or reset is None:
+            continue
+        windows[window] = {
+            "limit": int(headers.get(f"{prefix}-limit", 0) or 0),
+            "remaining": int(remaining),
+            "reset": int(reset),
+            "updated": int(time.time()),
+        }
+    if windows:
+        state_store.update_json(RATE_LIMIT_FILE, lambda state: state.update(windows))
+
+def exhausted_windows(needed=1):
+    now = time.time()
+    return {name: w for name, w in load_state().items()
+            if w.get("reset", 0) > now and w.get("remaining", 0) < max(needed, MIN_REMAINING)}
+
+def has_budget(needed=1):
+    """False when a recorded window has no posts left and has not reset yet."""
+    blocked = exhausted_windows(needed)
+    for name, w in blocked.items():
+        wait = int(w["reset"] - time.time())
+        print(f"⛔ X API budget exhausted ({name}: {w['remaining']}/{w['limit']} left, resets in {wait // 60} min).")
+    return not blocked
+
+# ---------------- Posting ----------------
+def create_tweet(text, reply_to=None):
+    """Post via the shared client, record rate-limit headers and return the new tweet ID.
+
+    Text is validated locally first (ValueError) so an over-long post never costs a request.
+    """
+    tweet_text.validate(text)
+    client = get_client()
+    try:
+        with metrics.timer("create_tweet"):
+            if reply_to:
+                resp = client.create_tweet(text=text, in_reply_to_tweet_id=reply_to)
+            else:
+                resp = client.create_tweet(text=text)
+    except Exception as e:
+        metrics.count("post_failed")
+        record_headers(getattr(getattr(e, "response", None), "headers", None))
+        raise
+    metrics.count("posted")
+    record_headers(resp.headers)
+    return resp.json()["data"]["id"]